@@ -625,9 +625,12 @@ class CrisisDashboard {
         container.innerHTML = '<h3>Live Watchlist Prices</h3><div class="panel-actions"><button type="button" class="refresh-btn" id="priceRefreshBtn" aria-label="Refresh live prices">Refresh</button></div><p class="panel-note">This shows today\'s percent change for stocks in your Watchlist. Green (📈) means up; red (📉) means down. The big news ticker above is separate; the Stock ±% slider only filters the news ticker.</p><ul class="price-list" id="priceList"></ul>';
         container.style.display = 'block';
         const list = document.getElementById('priceList');
+        // One batched request for the whole watchlist when the local proxy is running;
+        // symbols it could not price fall back to the per-symbol lookups
+        const batch = await this.fetchMarketBatch(tickers);
         const results = [];
         for (const sym of tickers) {
-            const quote = await this.fetchYahooQuote(sym);
+            const quote = batch[sym] || await this.fetchYahooQuote(sym);
             results.push({ sym, quote });
         }
         list.innerHTML = results.map(r => {
@@ -715,16 +718,20 @@ class CrisisDashboard {
         } catch (_) { return false; }
     }
 
-    _localProxyUrls(apiUrl) {
+    _localProxyBases() {
         const ports = [8001, 8003, 8002];
         const paramPort = (() => { try { const p = new URLSearchParams(window.location.search).get('proxyPort'); return p ? parseInt(p, 10) : null; } catch(_) { return null; } })();
         const host = '127.0.0.1';
         const list = [];
-        if (paramPort) list.push(`http://${host}:${paramPort}/proxy?url=${encodeURIComponent(apiUrl)}`);
-        ports.forEach(pt => list.push(`http://${host}:${pt}/proxy?url=${encodeURIComponent(apiUrl)}`));
+        if (paramPort) list.push(`http://${host}:${paramPort}`);
+        ports.forEach(pt => list.push(`http://${host}:${pt}`));
         return list;
     }
 
+    _localProxyUrls(apiUrl) {
+        return this._localProxyBases().map(base => `${base}/proxy?url=${encodeURIComponent(apiUrl)}`);
+    }
+
     getWatchlistSynonyms(entry) {
         const map = {
             'C': ['Citigroup', 'Citi', 'Citibank'],
@@ -1095,6 +1102,32 @@ class CrisisDashboard {
         }
     }
 
+    async fetchMarketBatch(symbols) {
+        // Quotes for many symbols from the local proxy's /market/batch, keyed by symbol ({} if unavailable)
+        const quotes = {};
+        if (!this.isLocalEnv() || this.marketProvider === 'public' || !symbols.length) return quotes;
+        const query = `symbols=${encodeURIComponent(symbols.join(','))}&fields=name,price,pct,currency`;
+        for (const base of this._localProxyBases()) {
+            const res = await this.fetchWithTimeout(`${base}/market/batch?${query}`, 6000);
+            if (!res || !res.ok) continue;
+            let data = null;
+            try { data = await res.json(); } catch { continue; }
+            for (const q of (data && Array.isArray(data.quotes) ? data.quotes : [])) {
+                const price = typeof q.price === 'number' ? q.price : null;
+                const pct = typeof q.pct === 'number' ? q.pct : null;
+                if (price === null && pct === null) continue;
+                const sym = String(q.symbol || '').toUpperCase();
+                const currency = q.currency || '';
+                const quote = { pct, price, name: q.name || '', currency, currencySymbol: this.currencySymbolForCode(currency) || '' };
+                this._saveYfQuoteCache(sym, quote);
+                if (pct !== null) this._saveYfCache(sym, pct);
+                quotes[sym] = quote;
+            }
+            return quotes;
+        }
+        return quotes;
+    }
+
     async fetchPublicQuote(symbol) {
         // Placeholder public adapter: returns null by default.
         // To enable, replace implementation with your chosen free API.
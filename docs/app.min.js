@@ -2,10 +2,15 @@
 console.log('[CrisisDashboard] simplified clean version 2025-12-24');
 
 class CrisisDashboard {
-      // Local fallback: always return synthetic data for requested symbols
+      // One /market/batch request for the whole watchlist (the proxy fans out upstream
+      // and returns only symbol, name, price and pct); an empty list falls back to per-symbol requests
       async fetchStockQuotes(symbols) {
-        // In local/dev mode, just return synthetic data
-        return this.syntheticStockSample(symbols);
+        const url = `${this.getProxyBase()}/market/batch?symbols=${encodeURIComponent(symbols.join(','))}&fields=name,price,pct`;
+        const res = await this.fetchWithTimeout(url, 8000);
+        if (!res || !res.ok) return [];
+        let data = null; try { data = await res.json(); } catch { return []; }
+        const quotes = data && Array.isArray(data.quotes) ? data.quotes : [];
+        return quotes.filter(q => q && (typeof q.price === 'number' || typeof q.pct === 'number'));
       }
     getWatchlistTickers() {
       // Extract up to 6 non-empty, trimmed, uppercased ticker symbols from the stock input fields
@@ -19,6 +24,7 @@ class CrisisDashboard {
     this.events = [];
     this.currentFilter = 'all';
     this.dataUrl = 'events.json';
+    this.manifestUrl = 'events.manifest.json';
     const defaultDisplay = 80; const slow=150, fast=6, min=0, max=100; const ratio = Math.max(0, Math.min(1, (defaultDisplay - min) / (max - min))); const d = Math.round(slow - ratio * (slow - fast));
     this._clearTickerDuration();
     this.tickerDuration = d; // lock to 80 on every load
@@ -27,6 +33,9 @@ class CrisisDashboard {
     // Stocks auto-refresh state
     this.autoRefreshTimer = null;
     this.rateLimitStreak = 0;
+    // Event delta polling state (local proxy only)
+    this.eventsSeq = null;
+    this.deltaRefreshTimer = null;
     this.init();
   }
 
@@ -36,6 +45,7 @@ class CrisisDashboard {
     await this.loadEvents();
     this.clearLoadingIfStuck();
     this.renderDiagnostics();
+    if (this.isLocalEnv()) this.startDeltaRefresh();
   }
 
   setupEventListeners() {
@@ -108,8 +118,13 @@ class CrisisDashboard {
       if (eventsEl) eventsEl.innerHTML = '';
 
       let data = null;
-      const url = this.dataUrl;
+      // Prefer the compact build; fall back to the full file if it is missing
       try {
+        data = await this.loadCompactEvents();
+        if (data) attempts.push({ url: this.manifestUrl, ok: true });
+      } catch (_) { data = null; }
+      const url = this.dataUrl;
+      if (!data) try {
         const response = await this.fetchWithTimeout(url, 6000);
         if (response && response.ok) {
           const text = await response.text();
@@ -137,6 +152,7 @@ class CrisisDashboard {
 
       this.lastEventLoadAttempts = attempts;
       this.events = data.events || [];
+      this.eventsSeq = typeof data.seq === 'number' ? data.seq : null;
       this.tickerConfig = data.ticker_config || { freshness_hours: 72, max_items: 20 };
       this.updateLastUpdated(data.last_updated);
       this.updateStats();
@@ -426,6 +442,68 @@ class CrisisDashboard {
   _clearTickerDuration() { try { localStorage.removeItem('tickerDuration'); } catch (_) {} }
   _loadTickerDuration() { try { const v = localStorage.getItem('tickerDuration'); const n = v ? parseInt(v, 10) : NaN; if (!Number.isNaN(n)) return n; } catch (_) {} return null; }
 
+  // Compact build (scraper/compact.py): the manifest is tiny and carries a content
+  // hash, so the payload is only downloaded when it changed since the last visit
+  async loadCompactEvents() {
+    const res = await this.fetchWithTimeout(`${this.manifestUrl}?t=${Date.now()}`, 4000);
+    if (!res || !res.ok) return null;
+    let manifest = null;
+    try { manifest = await res.json(); } catch { return null; }
+    if (!manifest || manifest.v !== 1 || !manifest.hash || !manifest.files) return null;
+    let payload = null;
+    try { const cached = JSON.parse(localStorage.getItem('compactEvents') || 'null'); if (cached && cached.hash === manifest.hash) payload = cached; } catch (_) {}
+    if (!payload) {
+      const r = await this.fetchWithTimeout(`${manifest.files.json}?h=${manifest.hash}`, 6000);
+      if (!r || !r.ok) return null;
+      try { payload = await r.json(); } catch { return null; }
+      if (!payload || payload.hash !== manifest.hash) return null;
+      try { localStorage.setItem('compactEvents', JSON.stringify(payload)); } catch (_) {}
+    }
+    const data = this.expandCompactEvents(payload);
+    data.last_updated = manifest.last_updated;
+    return data;
+  }
+  // Event deltas (scraper/deltas.py via the proxy's /events/since): only events
+  // added, updated or removed since the sequence number we hold are transferred
+  startDeltaRefresh(intervalMs = 5 * 60 * 1000) {
+    if (this.deltaRefreshTimer) clearInterval(this.deltaRefreshTimer);
+    this.deltaRefreshTimer = setInterval(() => { this.refreshEventsDelta().catch(() => {}); }, intervalMs);
+  }
+  async refreshEventsDelta() {
+    if (this.eventsSeq === null) return;
+    const res = await this.fetchWithTimeout(`${this.getProxyBase()}/events/since?seq=${this.eventsSeq}`, 6000);
+    if (!res || !res.ok) return;
+    let delta = null;
+    try { delta = await res.json(); } catch { return; }
+    if (!delta || typeof delta.seq !== 'number') return;
+    if (delta.full) {
+      this.events = delta.events || [];
+      if (delta.ticker_config) this.tickerConfig = delta.ticker_config;
+      this.updateLastUpdated(delta.last_updated);
+    } else {
+      const removed = new Set(delta.removed || []);
+      const changed = new Map([...(delta.added || []), ...(delta.updated || [])].map(e => [e.id, e]));
+      this.eventsSeq = delta.seq;
+      if (!removed.size && !changed.size) return;
+      const kept = this.events.filter(e => !removed.has(e.id) && !changed.has(e.id));
+      this.events = kept.concat([...changed.values()]).sort((a, b) => (b.severity_score || 0) - (a.severity_score || 0));
+    }
+    this.eventsSeq = delta.seq;
+    this.updateStats();
+    this.renderEvents();
+    this.renderTicker();
+  }
+  expandCompactEvents(payload) {
+    const fields = payload.fields || []; const strings = payload.strings || {};
+    const events = (payload.events || []).map(row => {
+      const e = {};
+      fields.forEach((f, i) => { const v = row[i]; if (v === null || v === undefined) return; e[f] = strings[f] ? strings[f][v] : v; });
+      if (e.is_ticker && e.ticker_emoji) e.ticker_label = `${e.ticker_emoji} ${e.title}`;
+      return e;
+    });
+    const { v, hash, fields: _fields, strings: _strings, events: _rows, ...extra } = payload;
+    return { ...extra, events };
+  }
   async fetchWithTimeout(url, ms = 4000) { const controller = new AbortController(); const id = setTimeout(() => controller.abort(), ms); try { const res = await fetch(url, { signal: controller.signal }); return res; } catch { return null; } finally { clearTimeout(id); } }
   showErrorBanner(error, attempts) { const errorEl = document.getElementById('error'); if (!errorEl) return; errorEl.innerHTML = '<p>❌ Unable to load events. Please try again later.</p>'; const banner = document.createElement('div'); banner.className = 'error-banner'; const message = error && error.message ? error.message : 'An unknown error occurred.'; const listItems = (attempts || []).map(a => { const status = a.ok ? 'OK' : (a.status ? `HTTP ${a.status}` : (a.error || 'error')); const href = a.url || ''; return `<li><a class="error-link" href="${href}" target="_blank" rel="noopener">${href}</a> — ${status}</li>`; }).join(''); banner.innerHTML = `<div><strong>Failed to load events.</strong> ${this.escapeHtml(message)}</div>${attempts && attempts.length ? `<ul>${listItems}</ul>` : ''}<div class="error-actions"><button type="button" class="retry-btn" aria-label="Retry loading events">Retry</button></div>`; errorEl.appendChild(banner); const retryBtn = banner.querySelector('.retry-btn'); if (retryBtn) { retryBtn.addEventListener('click', async () => { banner.remove(); errorEl.style.display = 'none'; const loadingEl = document.getElementById('loading'); if (loadingEl) loadingEl.style.display = 'block'; try { await this.loadEvents(); } finally { if (loadingEl) loadingEl.style.display = 'none'; } }); } }
   isLocalEnv() { try { return typeof window !== 'undefined' && /^(localhost|127\.0\.0\.1)$/i.test(window.location.hostname); } catch (_) { return false; } }
@@ -0,0 +1,577 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for the Crisis Management Web Scraper
+Measures ranking, HTML cleaning and feed parsing throughput, fetch wall
+time, proxy latency and event memory offline, against data/events.json
+and a local stand-in HTTP server
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+from pathlib import Path
+from typing import List, Dict
+import requests
+from event_index import EventIndex
+from timestamps import published_timestamp
+from fetcher import PARSE_POOL_CONTEXT, NewsFetcher, _init_parse_worker, _parse_in_worker
+from html_clean import clean_html, _soup_text
+from models import Event, event_json
+from ranker import SeverityRanker
+
+logger = logging.getLogger(__name__)
+
+BASE_PATH = Path(__file__).parent.parent
+RSS_CONTENT_TYPE = 'application/rss+xml'
+
+
+def load_fixture_events(count: int) -> List[Dict]:
+    """
+    Build a fixture of ``count`` events by cycling through data/events.json
+
+    Args:
+        count: Number of events wanted
+
+    Returns:
+        List of event dictionaries with title and description only
+    """
+    with open(BASE_PATH / "data" / "events.json", 'r', encoding='utf-8') as f:
+        recorded = json.load(f)['events']
+
+    return [
+        {
+            'title': recorded[i % len(recorded)].get('title', ''),
+            'description': recorded[i % len(recorded)].get('description', ''),
+        }
+        for i in range(count)
+    ]
+
+
+def _best_of(repeat: int, func) -> tuple:
+    """Run ``func`` ``repeat`` times, returning (best seconds, last result)"""
+    best, result = None, None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench_ranking(count: int, top_k: int = None, repeat: int = 3) -> Dict:
+    """
+    Compare per-event ``rank_events`` with columnar ``rank_batch``
+
+    Args:
+        count: Number of events to rank
+        top_k: Passed to ``rank_batch``
+        repeat: Runs per path; the fastest is reported
+
+    Returns:
+        Dictionary with events/second for both paths
+    """
+    with open(BASE_PATH / "config" / "severity_rules.json", 'r', encoding='utf-8') as f:
+        ranker = SeverityRanker(json.load(f))
+    events = load_fixture_events(count)
+
+    per_event_seconds, ranked = _best_of(repeat, lambda: ranker.rank_events([dict(event) for event in events]))
+
+    batch = {
+        'title': [event['title'] for event in events],
+        'description': [event['description'] for event in events],
+    }
+    batch_seconds, result = _best_of(repeat, lambda: ranker.rank_batch(batch, top_k=top_k))
+
+    return {
+        'events': count,
+        'top_k': top_k,
+        'per_event': {'seconds': per_event_seconds, 'events_per_second': count / per_event_seconds},
+        'batch': {'seconds': batch_seconds, 'events_per_second': count / batch_seconds},
+        'outputs_match': _batch_matches(events, ranked, result),
+    }
+
+
+def _batch_matches(events: List[Dict], ranked: List[Dict], result: Dict) -> bool:
+    """Check that batch columns agree with the per-event ranking, row by row"""
+    for row, index in enumerate(result['index']):
+        event = events[index]
+        expected = ranked[row]
+        actual = {
+            'title': event['title'],
+            'description': event['description'],
+            'severity_score': int(result['severity_score'][row]),
+            'severity_level': result['severity_level'][row],
+            'is_ticker': bool(result['is_ticker'][row]),
+        }
+        if actual['is_ticker']:
+            actual['ticker_category'] = result['ticker_category'][row]
+            actual['ticker_emoji'] = result['ticker_emoji'][row]
+            actual['ticker_label'] = f"{actual['ticker_emoji']} {event['title']}"
+        if actual != expected:
+            return False
+    return True
+
+
+def load_html_corpus(count: int) -> List[str]:
+    """
+    Build a golden corpus of descriptions from data/events.json
+
+    Recorded descriptions are used as-is and also wrapped in the kinds of
+    markup feeds deliver (paragraphs, links, entities, comments), so every
+    cleaning path is exercised.
+
+    Args:
+        count: Number of descriptions wanted
+
+    Returns:
+        List of raw description strings
+    """
+    with open(BASE_PATH / "data" / "events.json", 'r', encoding='utf-8') as f:
+        recorded = [event.get('description', '') for event in json.load(f)['events']]
+
+    wrappers = [
+        '{}',
+        '<p>{}</p>',
+        '<p>{}</p>\n<p><a href="https://example.com/?a=1&amp;b=2">Read more</a></p>',
+        '<div class="feed">{}&nbsp;&mdash; <b>Updated</b> &#8211; <i>&#x201C;live&#x201D;</i></div>',
+        '<img src="x.jpg" alt="x"/><br>{}<br/>',
+        '<!-- syndicated --><p>{}</p>',
+    ]
+    return [wrappers[i % len(wrappers)].format(recorded[i % len(recorded)]) for i in range(count)]
+
+
+def bench_clean_html(count: int, repeat: int = 3) -> Dict:
+    """
+    Compare the full BeautifulSoup parse with ``clean_html``
+
+    Args:
+        count: Number of descriptions to clean
+        repeat: Runs per path; the fastest is reported
+
+    Returns:
+        Dictionary with descriptions/second for both paths
+    """
+    corpus = load_html_corpus(count)
+
+    soup_seconds, expected = _best_of(repeat, lambda: [_soup_text(text) or 'No description available.'
+                                                      for text in corpus])
+    fast_seconds, actual = _best_of(repeat, lambda: [clean_html(text) for text in corpus])
+
+    return {
+        'descriptions': count,
+        'beautifulsoup': {'seconds': soup_seconds, 'per_second': count / soup_seconds},
+        'clean_html': {'seconds': fast_seconds, 'per_second': count / fast_seconds},
+        'outputs_match': actual == expected,
+    }
+
+
+def build_fixture_feeds(count: int, entries: int = 20) -> List[bytes]:
+    """
+    Build ``count`` RSS documents from the golden description corpus
+
+    Args:
+        count: Number of feeds
+        entries: Items per feed
+
+    Returns:
+        List of RSS documents as bytes
+    """
+    corpus = load_html_corpus(count * entries)
+    feeds = []
+    for feed in range(count):
+        items = ''.join(
+            f"<item><title>Story {feed}-{i}</title><link>https://example.com/{feed}/{i}</link>"
+            f"<description>{escape(corpus[feed * entries + i])}</description>"
+            f"<pubDate>Mon, 06 Jan 2025 12:00:00 GMT</pubDate></item>"
+            for i in range(entries)
+        )
+        feeds.append(f'<?xml version="1.0"?><rss version="2.0"><channel><title>Feed {feed}</title>'
+                     f'{items}</channel></rss>'.encode('utf-8'))
+    return feeds
+
+
+def bench_parse(count: int, workers: int, repeat: int = 3) -> Dict:
+    """
+    Compare parsing feeds in-process with the ``parse_workers`` process pool
+
+    Args:
+        count: Number of feeds to parse
+        workers: Parse worker processes
+        repeat: Runs per path; the fastest is reported
+
+    Returns:
+        Dictionary with feeds/second for both paths
+    """
+    feeds = build_fixture_feeds(count)
+    fetcher = NewsFetcher({})
+    names = [f"Feed {i}" for i in range(count)]
+
+    serial_seconds, expected = _best_of(repeat, lambda: [
+        fetcher.parse_content('rss', feed, name, content_type=RSS_CONTENT_TYPE)[0] for feed, name in zip(feeds, names)
+    ])
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=PARSE_POOL_CONTEXT, initializer=_init_parse_worker,
+                             initargs=({}, None)) as pool:
+        # Warm the workers up so process start-up is not measured
+        list(pool.map(_parse_in_worker, ['rss'] * workers, feeds[:workers], names[:workers],
+                      [''] * workers, [RSS_CONTENT_TYPE] * workers))
+        pool_seconds, results = _best_of(repeat, lambda: list(pool.map(
+            _parse_in_worker, ['rss'] * count, feeds, names, [''] * count, [RSS_CONTENT_TYPE] * count
+        )))
+
+    return {
+        'feeds': count,
+        'workers': workers,
+        'in_process': {'seconds': serial_seconds, 'feeds_per_second': count / serial_seconds},
+        'process_pool': {'seconds': pool_seconds, 'feeds_per_second': count / pool_seconds},
+        'outputs_match': [events for events, _, _, _ in results] == expected,
+    }
+
+
+class LatencyServer:
+    """Local stand-in for news sites and Yahoo, answering after a configurable delay"""
+
+    def __init__(self, routes: Dict[str, tuple], latency: float = 0.05, jitter: float = 0.02):
+        """
+        Initialize the server (started by ``with``)
+
+        Args:
+            routes: Path -> (content type, body bytes)
+            latency: Seconds every response is delayed by
+            jitter: Extra delay drawn uniformly from [0, jitter] per request
+        """
+        self.routes = routes
+        self.latency = latency
+        self.jitter = jitter
+        self._server = None
+        self._thread = None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                time.sleep(server.latency + random.uniform(0, server.jitter))
+                route = server.routes.get(self.path.split('?')[0])
+                if route is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                content_type, body = route
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def url(self, path: str) -> str:
+        """Absolute URL of a route"""
+        return f"http://127.0.0.1:{self._server.server_address[1]}{path}"
+
+    def __enter__(self) -> 'LatencyServer':
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._server.request_queue_size = 128
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def bench_fetch(source_counts: List[int], latency: float, jitter: float, repeat: int = 3) -> Dict:
+    """
+    Measure ``fetch_all`` wall time against the stand-in server
+
+    Args:
+        source_counts: Numbers of RSS sources to fetch per run
+        latency: Server delay per request in seconds
+        jitter: Extra random delay per request in seconds
+        repeat: Runs per configuration; the fastest is reported
+
+    Returns:
+        Dictionary with sequential and concurrent wall time per source count
+    """
+    feeds = build_fixture_feeds(max(source_counts))
+    routes = {f"/feeds/{i}.xml": (RSS_CONTENT_TYPE, feed) for i, feed in enumerate(feeds)}
+
+    runs = []
+    with LatencyServer(routes, latency, jitter) as server:
+        for count in source_counts:
+            sources = [{'name': f"Feed {i}", 'type': 'rss', 'url': server.url(f"/feeds/{i}.xml")}
+                       for i in range(count)]
+            run = {'sources': count}
+            for mode in ('sequential', 'concurrent'):
+                # The stand-in is a single host, so host throttling would only measure the limiter
+                fetcher = NewsFetcher({'sources': sources, 'fetch': {'mode': mode, 'per_host_interval': 0}})
+                seconds, events = _best_of(repeat, fetcher.fetch_all)
+                fetcher.session.close()
+                run[mode] = {'seconds': seconds, 'events': len(events)}
+            runs.append(run)
+
+    return {'latency': latency, 'jitter': jitter, 'runs': runs}
+
+
+def _percentile(samples: List[float], percent: int) -> float:
+    """Percentile of latency samples, interpolated between the nearest two"""
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100, method='inclusive')[percent - 1]
+
+
+def _load_test(urls: List[str], concurrency: int) -> Dict:
+    """Request every URL with ``concurrency`` keep-alive clients and time each request"""
+    local = threading.local()
+    sessions = []
+    lock = threading.Lock()
+
+    def get(url: str) -> tuple:
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+            with lock:
+                sessions.append(session)
+        start = time.perf_counter()
+        response = session.get(url, timeout=30)
+        return time.perf_counter() - start, response.status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(get, urls))
+    elapsed = time.perf_counter() - start
+    for session in sessions:
+        session.close()
+
+    latencies = [seconds for seconds, _ in results]
+    return {
+        'requests': len(urls),
+        'errors': sum(1 for _, status in results if status != 200),
+        'requests_per_second': len(urls) / elapsed,
+        'p50_ms': _percentile(latencies, 50) * 1000,
+        'p99_ms': _percentile(latencies, 99) * 1000,
+    }
+
+
+def bench_proxy(requests_count: int, concurrency: int, latency: float, jitter: float) -> Dict:
+    """
+    Load-test ``proxy_server`` in-process against the stand-in server
+
+    ``/proxy`` is measured with distinct upstream URLs (every request a
+    cache miss streamed from upstream) and with one URL (served from the
+    response cache after the first request).
+
+    Args:
+        requests_count: Requests per scenario
+        concurrency: Concurrent clients
+        latency: Upstream delay per request in seconds
+        jitter: Extra random upstream delay per request in seconds
+
+    Returns:
+        Dictionary with requests/second and p50/p99 latency per scenario
+    """
+    import proxy_server
+
+    with open(BASE_PATH / "data" / "events.json", 'rb') as f:
+        body = f.read()
+    routes = {'/events.json': ('application/json', body)}
+
+    with LatencyServer(routes, latency, jitter) as upstream:
+        httpd = proxy_server.ProxyServer(('127.0.0.1', 0), proxy_server.ProxyHandler)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        base = f"http://127.0.0.1:{httpd.server_address[1]}/proxy?url="
+        try:
+            upstream_url = upstream.url('/events.json')
+            results = {
+                'upstream_latency': latency,
+                'upstream_jitter': jitter,
+                'concurrency': concurrency,
+                'uncached': _load_test([f"{base}{upstream_url}%3Fn%3D{i}" for i in range(requests_count)],
+                                       concurrency),
+                'cached': _load_test([f"{base}{upstream_url}"] * requests_count, concurrency),
+            }
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+    return results
+
+
+def _brute_force_window(events: List[Dict], since, until, sort: str, offset: int, limit: int) -> Dict:
+    """Time-range query answered by scanning every event, to check ``EventIndex.query``"""
+    stamps = [published_timestamp(event.get('published')) for event in events]
+    matches = [position for position, stamp in enumerate(stamps)
+               if stamp is not None and (since is None or stamp >= since) and (until is None or stamp <= until)]
+    if sort == 'time':
+        matches.sort(key=lambda position: (-stamps[position], position))
+    return {'total': len(matches), 'events': [events[position] for position in matches[offset:offset + limit]]}
+
+
+def bench_query(count: int, repeat: int = 3) -> Dict:
+    """
+    Measure ``EventIndex`` build time and query latency
+
+    Args:
+        count: Number of indexed events, cycled from data/events.json
+        repeat: Builds timed; the fastest is reported
+
+    Returns:
+        Dictionary with build seconds, mean milliseconds per query and
+        whether time-range queries match a brute-force scan
+    """
+    with open(BASE_PATH / "data" / "events.json", 'r', encoding='utf-8') as f:
+        recorded = json.load(f)['events']
+    events = [dict(recorded[i % len(recorded)], title=f"{recorded[i % len(recorded)].get('title', '')} #{i}")
+              for i in range(count)]
+
+    build_seconds, index = _best_of(repeat, lambda: EventIndex(events))
+    newest = index.timestamps[-1] if index.timestamps else 0
+    queries = {
+        'keyword': {'text': 'attack'},
+        'category_severity': {'categories': ['war'], 'severities': ['critical', 'high']},
+        'last_6_hours_by_time': {'since': newest - 6 * 3600, 'sort': 'time'},
+        'everything_page_10': {'offset': 450, 'limit': 50},
+    }
+    latencies = {}
+    for name, arguments in queries.items():
+        index.query(**arguments)
+        runs = 1000
+        start = time.perf_counter()
+        for _ in range(runs):
+            index.query(**arguments)
+        latencies[name] = {'ms': (time.perf_counter() - start) / runs * 1000,
+                           'total': index.query(**arguments)['total']}
+
+    # Time-range paths in both orders, including an empty (inverted) window
+    oldest = index.timestamps[0] if index.timestamps else 0
+    windows = [(newest - 6 * 3600, None), (None, newest - 6 * 3600), (oldest, newest),
+               ((oldest + newest) / 2, newest - 3600), (newest - 3600, newest - 7 * 3600)]
+    matches = all(
+        {key: result[key] for key in ('total', 'events')} == _brute_force_window(events, since, until, sort, 10, 50)
+        for since, until in windows for sort in ('rank', 'time')
+        for result in [index.query(since=since, until=until, sort=sort, offset=10, limit=50)]
+    )
+
+    return {'events': count, 'build_seconds': build_seconds, 'queries': latencies, 'outputs_match': matches}
+
+
+def _measure_memory(build) -> tuple:
+    """Run ``build`` under tracemalloc, returning (bytes still allocated, result)"""
+    tracemalloc.start()
+    try:
+        result = build()
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return allocated, result
+
+
+def bench_memory(count: int, repeat: int = 3) -> Dict:
+    """
+    Compare the memory of ranked events held as dictionaries and as ``Event`` objects
+
+    Events are rebuilt from JSON the way ``EventStore.load_ranked`` does,
+    so every dictionary carries its own copies of the keys' values.
+
+    Args:
+        count: Number of events, cycled from data/events.json with unique titles
+        repeat: Serializations timed; the fastest is reported
+
+    Returns:
+        Dictionary with bytes per event and events.json serialization time
+        for both representations, and the model's serialization time as a
+        multiple of the dictionaries' (above 1 is slower)
+    """
+    with open(BASE_PATH / "data" / "events.json", 'r', encoding='utf-8') as f:
+        recorded = json.load(f)['events']
+    rows = []
+    for i in range(count):
+        event = dict(recorded[i % len(recorded)])
+        event['title'] = f"{event.get('title', '')} #{i}"
+        if event.get('ticker_emoji'):
+            event['ticker_label'] = f"{event['ticker_emoji']} {event['title']}"
+        rows.append(json.dumps(event, ensure_ascii=False))
+
+    dict_bytes, dicts = _measure_memory(lambda: [json.loads(row) for row in rows])
+    model_bytes, models = _measure_memory(lambda: [Event.from_dict(json.loads(row)) for row in rows])
+    dict_seconds, dict_text = _best_of(repeat, lambda: [json.dumps(e, indent=2, ensure_ascii=False) for e in dicts])
+    model_seconds, model_text = _best_of(repeat, lambda: [event_json(e, indent=2) for e in models])
+
+    return {
+        'events': count,
+        'dict': {'bytes_per_event': dict_bytes / count, 'serialize_seconds': dict_seconds},
+        'model': {'bytes_per_event': model_bytes / count, 'serialize_seconds': model_seconds},
+        'serialize_ratio': model_seconds / dict_seconds,
+        'outputs_match': dict_text == model_text,
+    }
+
+
+def main():
+    """Run the benchmarks and print JSON results"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--events', type=int, default=20000, help='number of events to rank')
+    parser.add_argument('--top-k', type=int, default=None, help='only select the k most severe events')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per benchmark; the fastest is reported')
+    parser.add_argument('--descriptions', type=int, default=5000, help='number of descriptions to clean')
+    parser.add_argument('--feeds', type=int, default=200, help='number of feeds to parse')
+    parser.add_argument('--parse-workers', type=int, default=os.cpu_count() or 1,
+                        help='processes for the parse pool benchmark')
+    parser.add_argument('--sources', default='1,10,50',
+                        help='comma-separated source counts for the fetch benchmark')
+    parser.add_argument('--latency', type=float, default=0.05, help='stand-in server delay in seconds')
+    parser.add_argument('--jitter', type=float, default=0.02, help='extra random stand-in delay in seconds')
+    parser.add_argument('--proxy-requests', type=int, default=500, help='requests per proxy scenario')
+    parser.add_argument('--proxy-concurrency', type=int, default=16, help='concurrent proxy clients')
+    parser.add_argument('--query-events', type=int, default=20000, help='number of events in the query index')
+    parser.add_argument('--memory-events', type=int, default=100000, help='number of events held in memory')
+    parser.add_argument('--only', default=None,
+                        help='comma-separated benchmarks to run (ranking, clean_html, parse, fetch, proxy, query, '
+                             'memory)')
+    parser.add_argument('--output', type=Path, default=None, help='also write the results to this JSON file')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    benchmarks = {
+        'ranking': lambda: bench_ranking(args.events, args.top_k, args.repeat),
+        'clean_html': lambda: bench_clean_html(args.descriptions, args.repeat),
+        'parse': lambda: bench_parse(args.feeds, args.parse_workers, args.repeat),
+        'fetch': lambda: bench_fetch([int(n) for n in args.sources.split(',') if n.strip()],
+                                     args.latency, args.jitter, args.repeat),
+        'proxy': lambda: bench_proxy(args.proxy_requests, args.proxy_concurrency, args.latency, args.jitter),
+        'query': lambda: bench_query(args.query_events, args.repeat),
+        'memory': lambda: bench_memory(args.memory_events, args.repeat),
+    }
+    selected = args.only.split(',') if args.only else list(benchmarks)
+    unknown = [name for name in selected if name not in benchmarks]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    results = {'started': datetime.utcnow().isoformat() + "Z"}
+    results.update((name, benchmarks[name]()) for name in selected)
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        args.output.write_text(output + '\n', encoding='utf-8')
+
+
+if __name__ == "__main__":
+    main()
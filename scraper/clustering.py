@@ -0,0 +1,174 @@
+"""
+Story clustering module
+Groups near-duplicate stories from different outlets with MinHash
+signatures and an LSH index, so grouping stays sub-quadratic
+"""
+
+import hashlib
+import logging
+import random
+import re
+from typing import Container, List, Dict, Set
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r'\w+')
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has have in is it its of on or that the this to was were will with'.split()
+)
+
+DEFAULT_CLUSTER_SETTINGS = {
+    'enabled': True,
+    'threshold': 0.6,     # Jaccard similarity to every member needed to join a cluster
+    'num_perm': 64,       # MinHash signature length
+    'bands': 16,          # LSH bands; num_perm must be divisible by it
+    'shingle_size': 2,    # words per shingle
+    'min_tokens': 4,      # titles with fewer tokens are never clustered
+}
+
+
+class StoryClusterer:
+    """Collapses near-duplicate events into one canonical event per story"""
+
+    def __init__(self, settings: Dict = None):
+        """
+        Initialize clusterer
+
+        Args:
+            settings: Overrides for DEFAULT_CLUSTER_SETTINGS
+        """
+        self.settings = {**DEFAULT_CLUSTER_SETTINGS, **(settings or {})}
+        self.num_perm = self.settings['num_perm']
+        self.bands = self.settings['bands']
+        if self.num_perm % self.bands:
+            raise ValueError("clustering num_perm must be divisible by bands")
+        self.rows = self.num_perm // self.bands
+
+        # One random 64-bit mask per "permutation": XOR with a mask reorders
+        # hash values, and min() over map() keeps the inner loop in C.
+        # Fixed seed so signatures (and clusters) are identical across runs.
+        rng = random.Random(1)
+        self._masks = [rng.getrandbits(64) for _ in range(self.num_perm)]
+
+    def shingles(self, event: Dict) -> Set[str]:
+        """
+        Word shingles of an event title, ignoring case, punctuation and stopwords
+
+        Args:
+            event: Event dictionary
+
+        Returns:
+            Set of shingles (empty if the title is too short to cluster)
+        """
+        tokens = [t for t in WORD_PATTERN.findall(event.get('title', '').lower()) if t not in STOPWORDS]
+        if len(tokens) < self.settings['min_tokens']:
+            return set()
+        size = self.settings['shingle_size']
+        return {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+    def signature(self, shingles: Set[str]) -> List[int]:
+        """
+        MinHash signature of a shingle set
+
+        Args:
+            shingles: Non-empty set of shingles
+
+        Returns:
+            List of ``num_perm`` minimum hash values
+        """
+        hashes = [
+            int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'big')
+            for s in shingles
+        ]
+        return [min(map(mask.__xor__, hashes)) for mask in self._masks]
+
+    def cluster(self, events: List[Dict]) -> List[List[int]]:
+        """
+        Group events whose titles all share at least the threshold of shingles
+
+        Candidates come from LSH buckets (events sharing any band), so only
+        likely duplicates are compared. Events are taken in input order and
+        join the first earlier cluster they match with every member of, so
+        similar titles cannot chain unrelated stories into one cluster.
+
+        Args:
+            events: Event dictionaries
+
+        Returns:
+            Clusters as lists of event positions, in input order
+        """
+        threshold = self.settings['threshold']
+        shingle_sets: Dict[int, Set[str]] = {}
+        cluster_of: Dict[int, int] = {}
+        clusters: List[List[int]] = []
+        buckets: Dict[tuple, List[int]] = {}
+        for index, event in enumerate(events):
+            shingles = self.shingles(event)
+            keys = []
+            candidates = set()
+            if shingles:
+                shingle_sets[index] = shingles
+                signature = self.signature(shingles)
+                for band in range(self.bands):
+                    key = (band, tuple(signature[band * self.rows:(band + 1) * self.rows]))
+                    keys.append(key)
+                    candidates.update(cluster_of[other] for other in buckets.get(key, ()))
+
+            for candidate in sorted(candidates):
+                members = clusters[candidate]
+                if all(self.similarity(shingles, shingle_sets[other]) >= threshold for other in members):
+                    break
+            else:
+                candidate = len(clusters)
+                clusters.append([])
+            clusters[candidate].append(index)
+            cluster_of[index] = candidate
+            for key in keys:
+                buckets.setdefault(key, []).append(index)
+
+        return clusters
+
+    @staticmethod
+    def similarity(first: Set[str], second: Set[str]) -> float:
+        """Jaccard similarity of two shingle sets"""
+        return len(first & second) / len(first | second)
+
+    def collapse(self, events: List[Dict], known_ids: Container[str] = ()) -> List[Dict]:
+        """
+        Replace each cluster with one canonical event, annotated with the others
+
+        The canonical event is the first member already in ``known_ids``
+        (so a stored story keeps its ID as more outlets join it), otherwise
+        the first member. It gains ``source_count`` (distinct outlets),
+        ``member_urls``, ``also_reported_by`` and ``member_hash``, a digest
+        of the member IDs that changes when outlets join or leave, so the
+        story is ranked again. Its ``content_hash`` stays that of its own
+        title and description.
+
+        Args:
+            events: Events from ``NewsFetcher.fetch_all``
+            known_ids: IDs of stored events (optional)
+
+        Returns:
+            One event per story, in input order
+        """
+        if not self.settings['enabled']:
+            return events
+
+        collapsed = []
+        for members in self.cluster(events):
+            known = [i for i in members if events[i].get('id') in known_ids]
+            first = known[0] if known else members[0]
+            canonical = events[first]
+            if len(members) > 1:
+                members = [first] + [i for i in members if i != first]
+                sources = list(dict.fromkeys(events[i].get('source', '') for i in members))
+                canonical['source_count'] = len(sources)
+                canonical['member_urls'] = list(dict.fromkeys(events[i].get('url', '') for i in members))
+                canonical['also_reported_by'] = [s for s in sources if s != canonical.get('source')]
+                basis = ''.join(sorted(events[i].get('id', '') for i in members))
+                canonical['member_hash'] = hashlib.sha1(basis.encode('utf-8')).hexdigest()
+            collapsed.append(canonical)
+
+        logger.info(f"Clustered {len(events)} events into {len(collapsed)} stories")
+        return collapsed
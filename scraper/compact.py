@@ -0,0 +1,167 @@
+"""
+Compact build module
+Writes a minified, string-interned copy of the events payload with
+precompressed siblings and a manifest, so dashboard polls stay small
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import brotli
+except ImportError:  # brotli is only needed for the .br sibling
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+DEFAULT_COMPACT_SETTINGS = {
+    'enabled': True,
+    'dir': '../docs',                   # relative to events.json; the dashboard fetches from here
+    'name': 'events.compact.json',      # compact payload
+    'manifest': 'events.manifest.json',
+    'description_chars': 201,           # the dashboard cuts at 200, so cards render the same
+    'interned_fields': ['source', 'type', 'severity_level', 'ticker_category', 'ticker_emoji'],
+    'gzip': True,
+    'brotli': True,                     # skipped when the brotli package is missing
+}
+
+# Internal bookkeeping and fields the dashboard can rebuild
+DROPPED_FIELDS = frozenset(('content_hash', 'member_urls', 'member_hash', 'ticker_label'))
+
+
+def _truncate(text: str, limit: Optional[int]) -> str:
+    """Cut a description to ``limit`` characters (no limit if None)"""
+    if limit is None or len(text) <= limit:
+        return text
+    return text[:limit]
+
+
+def build_compact(events: List[Dict], extra: Optional[Dict] = None, settings: Optional[Dict] = None) -> Dict:
+    """
+    Build the compact payload
+
+    Events become rows of a column table; values of the interned fields
+    are replaced by indexes into per-field string tables. ``ticker_label``
+    is dropped since it is always ``"<ticker_emoji> <title>"``.
+
+    Args:
+        events: Ranked events, in output order
+        extra: Additional top-level keys (e.g. ``ticker_config``)
+        settings: Overrides for DEFAULT_COMPACT_SETTINGS
+
+    Returns:
+        Payload dictionary
+    """
+    settings = {**DEFAULT_COMPACT_SETTINGS, **(settings or {})}
+    interned = list(settings['interned_fields'])
+    limit = settings['description_chars']
+
+    fields: List[str] = []
+    for event in events:
+        for key in event:
+            if key not in DROPPED_FIELDS and key not in fields:
+                fields.append(key)
+
+    tables: Dict[str, List[str]] = {field: [] for field in interned if field in fields}
+    indexes: Dict[str, Dict[str, int]] = {field: {} for field in tables}
+
+    rows = []
+    for event in events:
+        row = []
+        for field in fields:
+            value = event.get(field)
+            if field == 'description' and isinstance(value, str):
+                value = _truncate(value, limit)
+            elif field in tables and value is not None:
+                index = indexes[field].get(value)
+                if index is None:
+                    index = indexes[field][value] = len(tables[field])
+                    tables[field].append(value)
+                value = index
+            row.append(value)
+        rows.append(row)
+
+    payload = {
+        'v': FORMAT_VERSION,
+        'event_count': len(events),
+        'fields': fields,
+        'strings': tables,
+        'events': rows,
+    }
+    payload.update(extra or {})
+    return payload
+
+
+def write_compact(events: List[Dict], output_dir: Path, extra: Optional[Dict] = None,
+                  settings: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    Write the compact payload, its compressed siblings and the manifest
+
+    The payload carries no timestamp, so its files only change when the
+    events do; ``last_updated`` lives in the manifest next to a hash of the
+    payload, letting a client that already holds that version skip the
+    download.
+
+    Args:
+        events: Ranked events, in output order
+        output_dir: Directory of events.json
+        extra: Additional top-level keys (e.g. ``ticker_config``)
+        settings: Overrides for DEFAULT_COMPACT_SETTINGS; ``dir`` places
+            the files relative to ``output_dir``
+
+    Returns:
+        Manifest dictionary, or None when the compact build is disabled
+    """
+    settings = {**DEFAULT_COMPACT_SETTINGS, **(settings or {})}
+    if not settings['enabled']:
+        return None
+
+    output_dir = Path(os.path.normpath(Path(output_dir) / settings['dir']))
+    output_dir.mkdir(parents=True, exist_ok=True)
+    payload = build_compact(events, extra, settings)
+    digest = hashlib.sha256(
+        json.dumps(payload, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    ).hexdigest()[:16]
+
+    payload['hash'] = digest
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    name = settings['name']
+    files = {'json': name}
+    sizes = {'json': len(body)}
+    (output_dir / name).write_bytes(body)
+
+    if settings['gzip']:
+        # mtime=0 keeps the bytes identical for identical payloads
+        compressed = gzip.compress(body, compresslevel=9, mtime=0)
+        (output_dir / f"{name}.gz").write_bytes(compressed)
+        files['gz'] = f"{name}.gz"
+        sizes['gz'] = len(compressed)
+
+    if settings['brotli'] and brotli is not None:
+        compressed = brotli.compress(body, quality=11)
+        (output_dir / f"{name}.br").write_bytes(compressed)
+        files['br'] = f"{name}.br"
+        sizes['br'] = len(compressed)
+
+    manifest = {
+        'v': FORMAT_VERSION,
+        'hash': digest,
+        'last_updated': datetime.utcnow().isoformat() + "Z",
+        'event_count': len(events),
+        'files': files,
+        'bytes': sizes,
+    }
+    with open(output_dir / settings['manifest'], 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, separators=(',', ':'))
+
+    logger.info(f"Wrote compact build {output_dir / name} ({', '.join(f'{k}: {v} B' for k, v in sizes.items())})")
+    return manifest
@@ -0,0 +1,184 @@
+"""
+Delta log module
+Publishes the events added, updated and removed by each run under an
+increasing sequence number, so clients can catch up on changes only
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from event_store import event_key
+from models import event_default
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DELTA_SETTINGS = {
+    'enabled': True,
+    'keep': 48,  # deltas kept on disk; clients further behind get a full snapshot
+}
+
+
+def _event_id(event: Dict) -> str:
+    """Stable ID of an event (events from older runs may lack one)"""
+    return event.get('id') or event_key(event.get('url', ''), event.get('title', ''), event.get('source', ''))
+
+
+def _event_hash(event: Dict) -> str:
+    """Hash of everything a client renders for an event"""
+    return hashlib.sha1(json.dumps(event, sort_keys=True, ensure_ascii=False, default=event_default).encode('utf-8')).hexdigest()
+
+
+def _write_json(path: Path, data: Dict) -> None:
+    """Write JSON atomically, so a concurrent reader never sees half a file"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'), default=event_default)
+    os.replace(tmp_path, path)
+
+
+class DeltaLog:
+    """Directory of per-run delta files plus an index of the last snapshot"""
+
+    def __init__(self, directory: Path, keep: int = 48):
+        """
+        Initialize the log
+
+        Args:
+            directory: Directory holding index.json and delta-<seq>.json files
+            keep: Number of most recent deltas kept on disk
+        """
+        self.directory = Path(directory)
+        self.keep = keep
+        self.index_path = self.directory / 'index.json'
+        # (mtime and size of index.json, its seq), so polling current_seq
+        # only parses the index after a run rewrote it
+        self._seq_cache: Optional[tuple] = None
+
+    def _load_index(self) -> Dict:
+        """Load the index, starting empty on any problem"""
+        if not self.index_path.exists():
+            return {'seq': 0, 'hashes': {}}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable delta index {self.index_path}: {e}")
+            return {'seq': 0, 'hashes': {}}
+
+    def _delta_path(self, seq: int) -> Path:
+        return self.directory / f"delta-{seq}.json"
+
+    def current_seq(self) -> int:
+        """Sequence number of the latest published snapshot (0 before the first run)"""
+        try:
+            stat = os.stat(self.index_path)
+        except OSError:
+            return 0
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._seq_cache
+        if cached is None or cached[0] != signature:
+            cached = self._seq_cache = (signature, self._load_index().get('seq', 0))
+        return cached[1]
+
+    def record(self, events: List[Dict]) -> int:
+        """
+        Compare a run's events with the previous run and publish the difference
+
+        A run that changes nothing keeps the current sequence number and
+        writes no delta.
+
+        Args:
+            events: Ranked events about to be written to events.json
+
+        Returns:
+            Sequence number of this snapshot
+        """
+        index = self._load_index()
+        previous: Dict[str, str] = index.get('hashes', {})
+        hashes: Dict[str, str] = {}
+        added, updated = [], []
+        for event in events:
+            event_id = _event_id(event)
+            if event_id in hashes:
+                continue
+            digest = hashes[event_id] = _event_hash(event)
+            if event_id not in previous:
+                added.append(event)
+            elif previous[event_id] != digest:
+                updated.append(event)
+        removed = [event_id for event_id in previous if event_id not in hashes]
+
+        seq = index.get('seq', 0)
+        if not (added or updated or removed) and self.index_path.exists():
+            logger.info(f"No event changes, delta sequence stays at {seq}")
+            return seq
+
+        seq += 1
+        self.directory.mkdir(parents=True, exist_ok=True)
+        _write_json(self._delta_path(seq), {
+            'seq': seq,
+            'generated': datetime.utcnow().isoformat() + "Z",
+            'added': added,
+            'updated': updated,
+            'removed': removed,
+        })
+        _write_json(self.index_path, {'seq': seq, 'hashes': hashes})
+
+        stale = self._delta_path(seq - self.keep)
+        if seq > self.keep and stale.exists():
+            stale.unlink()
+
+        logger.info(f"Delta {seq}: {len(added)} added, {len(updated)} updated, {len(removed)} removed")
+        return seq
+
+    def since(self, seq: int) -> Optional[Dict]:
+        """
+        Merge the deltas published after a sequence number
+
+        Args:
+            seq: Last sequence number the client applied
+
+        Returns:
+            Dictionary with ``seq``, ``added``, ``updated`` and ``removed``,
+            or None when the client is too far behind (or ahead) and needs
+            a full snapshot
+        """
+        if not self.index_path.exists():
+            return None
+        current = self.current_seq()
+        if seq < 0 or seq > current or current - seq > self.keep:
+            return None
+
+        first_op: Dict[str, str] = {}
+        last: Dict[str, tuple] = {}
+        for number in range(seq + 1, current + 1):
+            try:
+                with open(self._delta_path(number), 'r', encoding='utf-8') as f:
+                    delta = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                return None
+            for op in ('added', 'updated'):
+                for event in delta.get(op, []):
+                    event_id = _event_id(event)
+                    first_op.setdefault(event_id, op)
+                    last[event_id] = (op, event)
+            for event_id in delta.get('removed', []):
+                first_op.setdefault(event_id, 'removed')
+                last[event_id] = ('removed', None)
+
+        merged = {'seq': current, 'added': [], 'updated': [], 'removed': []}
+        for event_id, (op, event) in last.items():
+            # Whether the client already had the event decides how it is reported
+            known_before = first_op[event_id] != 'added'
+            if op == 'removed':
+                if known_before:
+                    merged['removed'].append(event_id)
+            elif known_before:
+                merged['updated'].append(event)
+            else:
+                merged['added'].append(event)
+        return merged
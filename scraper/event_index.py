@@ -0,0 +1,271 @@
+"""
+Event index module
+In-memory bitmap indexes over the ranked events (terms, categories,
+severity levels, sources and publish time) for fast filtered, paginated
+queries
+"""
+
+import bisect
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+from timestamps import published_timestamp
+
+logger = logging.getLogger(__name__)
+
+TERM_PATTERN = re.compile(r'\w+')
+MAX_PAGE_SIZE = 500
+# Time-ordered events per precomputed prefix mask, for time-range filters in rank order
+TIME_BLOCK = 512
+# Term masks kept per index; terms are turned into bitmasks on first use
+MAX_CACHED_TERMS = 1024
+
+# Bit indexes set in each byte value, for walking a bitmask byte by byte
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+
+
+def tokenize(text: str) -> Set[str]:
+    """Lowercase word terms of a text"""
+    return set(TERM_PATTERN.findall(text.lower()))
+
+
+def _mask(positions: Iterable[int], size: int) -> int:
+    """Bitmask with the given positions set"""
+    bits = bytearray((size + 7) // 8)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def _lowest(mask: int, skip: int, count: int) -> List[int]:
+    """Positions of the set bits of a mask, lowest first, after skipping some"""
+    found: List[int] = []
+    if count <= 0:
+        return found
+    for offset, byte in enumerate(mask.to_bytes((mask.bit_length() + 7) // 8, 'little')):
+        if not byte:
+            continue
+        bits = _BYTE_BITS[byte]
+        if skip >= len(bits):
+            skip -= len(bits)
+            continue
+        for bit in bits[skip:]:
+            found.append(offset * 8 + bit)
+            if len(found) == count:
+                return found
+        skip = 0
+    return found
+
+
+class EventIndex:
+    """
+    Indexes over one snapshot of ranked events
+
+    Every posting list is a bitmask in two orders: by rank (bit i is the
+    i-th most severe event) and by time (bit i is the i-th newest event).
+    Filters are bitwise ANDs and a page is the lowest set bits of the
+    result in the requested order.
+    """
+
+    def __init__(self, events: List[Dict], previous: Optional['EventIndex'] = None):
+        """
+        Build the indexes
+
+        Args:
+            events: Ranked events, most severe first
+            previous: Index of the previous snapshot; terms and timestamps of
+                unchanged events are reused from it
+        """
+        self.events = events
+        size = self.size = len(events)
+        self._term_cache: Dict[tuple, tuple] = {}
+        self._term_masks: Dict[str, tuple] = {}
+        old_cache = previous._term_cache if previous else {}
+
+        terms: Dict[str, List[int]] = {}
+        fields: Dict[str, Dict[str, List[int]]] = {'ticker_category': {}, 'severity_level': {}, 'source': {}}
+        dated = []
+        undated = []
+        reused = 0
+        for position, event in enumerate(events):
+            key = (event.get('title', ''), event.get('description', ''), event.get('published'))
+            cached = old_cache.get(key)
+            if cached is None:
+                cached = (tokenize(f"{key[0]} {key[1]}"), published_timestamp(key[2]))
+            else:
+                reused += 1
+            self._term_cache[key] = cached
+            words, timestamp = cached
+
+            for word in words:
+                terms.setdefault(word, []).append(position)
+            for field, postings in fields.items():
+                if event.get(field):
+                    postings.setdefault(str(event[field]).lower(), []).append(position)
+            if timestamp is None:
+                undated.append(position)
+            else:
+                dated.append((-timestamp, position))
+
+        # Time order: newest first (ties by rank), undated events last
+        dated.sort()
+        self.time_order = [position for _, position in dated] + undated
+        self.dated = len(dated)
+        self.timestamps = [-negated for negated, _ in reversed(dated)]  # oldest first, for bisect
+        time_of = [0] * size
+        for rank, position in enumerate(self.time_order):
+            time_of[position] = rank
+        self._time_of = time_of
+
+        self.terms = terms
+        self.fields = {
+            field: {value: self._masks(postings) for value, postings in postings_by_value.items()}
+            for field, postings_by_value in fields.items()
+        }
+        # Rank-order masks of the newest k * TIME_BLOCK events
+        self._time_prefix = [0]
+        for start in range(0, size, TIME_BLOCK):
+            block = _mask(self.time_order[start:start + TIME_BLOCK], size)
+            self._time_prefix.append(self._time_prefix[-1] | block)
+        logger.info(f"Indexed {size} events ({len(terms)} terms, {reused} reused)")
+
+    def _masks(self, positions: List[int]) -> tuple:
+        """(rank-order mask, time-order mask) of a posting list"""
+        return _mask(positions, self.size), _mask((self._time_of[p] for p in positions), self.size)
+
+    def _term(self, term: str) -> tuple:
+        """Masks of a term, built on first use"""
+        masks = self._term_masks.get(term)
+        if masks is None:
+            if len(self._term_masks) >= MAX_CACHED_TERMS:
+                self._term_masks.clear()
+            masks = self._term_masks[term] = self._masks(self.terms.get(term, []))
+        return masks
+
+    def _newest(self, count: int) -> int:
+        """Rank-order mask of the ``count`` newest events"""
+        block, rest = divmod(count, TIME_BLOCK)
+        mask = self._time_prefix[block]
+        if rest:
+            start = block * TIME_BLOCK
+            mask |= _mask(self.time_order[start:start + rest], self.size)
+        return mask
+
+    def query(self, text: str = '', categories: Iterable[str] = (), severities: Iterable[str] = (),
+              sources: Iterable[str] = (), since: Optional[float] = None, until: Optional[float] = None,
+              sort: str = 'rank', offset: int = 0, limit: int = 50) -> Dict:
+        """
+        Find events matching every given filter
+
+        Values within one filter are alternatives (any category listed);
+        keyword terms must all appear in the title or description.
+
+        Args:
+            text: Keywords
+            categories: Ticker categories (e.g. war, terrorism)
+            severities: Severity levels (critical, high, medium, low)
+            sources: Source names
+            since: Earliest publish time (POSIX timestamp)
+            until: Latest publish time (POSIX timestamp)
+            sort: "rank" (most severe first) or "time" (newest first)
+            offset: Matches to skip
+            limit: Page size (at most MAX_PAGE_SIZE)
+
+        Returns:
+            Dictionary with the ``total`` match count and the page of ``events``
+        """
+        limit = max(0, min(limit, MAX_PAGE_SIZE))
+        offset = max(0, offset)
+        by_time = sort == 'time'
+        side = 1 if by_time else 0
+        mask = (1 << self.size) - 1
+
+        for term in tokenize(text):
+            mask &= self._term(term)[side]
+        for field, values in (('ticker_category', categories), ('severity_level', severities),
+                              ('source', sources)):
+            values = [value.lower() for value in values if value]
+            if values:
+                union = 0
+                for value in values:
+                    union |= self.fields[field].get(value, (0, 0))[side]
+                mask &= union
+        if since is not None or until is not None:
+            # Dated events occupy time positions [0, dated), newest first
+            first = 0 if until is None else self.dated - bisect.bisect_right(self.timestamps, until)
+            last = self.dated if since is None else self.dated - bisect.bisect_left(self.timestamps, since)
+            # An empty window (since after until) must not invert the range masks
+            last = max(last, first)
+            if by_time:
+                mask &= ((1 << last) - 1) ^ ((1 << first) - 1)
+            else:
+                mask &= self._newest(last) ^ self._newest(first)
+
+        page = _lowest(mask, offset, limit)
+        if by_time:
+            page = [self.time_order[rank] for rank in page]
+
+        return {
+            'total': mask.bit_count(),
+            'offset': offset,
+            'limit': limit,
+            'events': [self.events[position] for position in page],
+        }
+
+
+class IndexedEventsFile:
+    """Event index over events.json, rebuilt when the file changes"""
+
+    def __init__(self, path: Path, check_interval: float = 1.0):
+        """
+        Initialize without loading; the first ``get`` builds the index
+
+        Args:
+            path: events.json written by the scraper
+            check_interval: Seconds between checks for a new file
+        """
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self.index: Optional[EventIndex] = None
+        self.document: Dict = {}
+        self._signature = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> EventIndex:
+        """
+        Current index, reloading first if events.json changed
+
+        Returns:
+            EventIndex of the latest snapshot
+
+        Raises:
+            OSError, ValueError: If events.json cannot be read on first use
+        """
+        now = time.monotonic()
+        if self.index is not None and now - self._checked < self.check_interval:
+            return self.index
+
+        with self._lock:
+            self._checked = now
+            stat = os.stat(self.path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if signature != self._signature:
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        document = json.load(f)
+                except (OSError, ValueError):
+                    if self.index is None:
+                        raise
+                    # Keep serving the last good snapshot
+                    logger.warning(f"Could not reload {self.path}, keeping the previous index")
+                    return self.index
+                self.index = EventIndex(document.get('events', []), self.index)
+                self.document = {key: value for key, value in document.items() if key != 'events'}
+                self._signature = signature
+            return self.index
@@ -0,0 +1,280 @@
+"""
+Event store module
+Persists ranked events across runs in SQLite so only new or changed
+events need cleaning and ranking
+"""
+
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import List, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from models import Event, event_default
+from timestamps import normalize_published
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that only track the click and never change the story
+TRACKING_PARAMS = re.compile(r'^(utm_\w+|at_\w+|cmp|cmpid|ito|ocid|fbclid|gclid|mc_cid|mc_eid|taid|ns_\w+)$', re.IGNORECASE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    severity_score INTEGER NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_last_seen ON events (last_seen);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a story URL so the same article maps to one key
+
+    Lowercases scheme and host, drops ``www.``, fragments, tracking
+    parameters and trailing slashes.
+
+    Args:
+        url: Article URL
+
+    Returns:
+        Normalized URL (empty string for an empty URL)
+    """
+    if not url:
+        return ''
+
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if not TRACKING_PARAMS.match(k)))
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit(('https' if parts.scheme in ('http', 'https') else parts.scheme.lower(), host, path, query, ''))
+
+
+def event_key(url: str, title: str, source_name: str) -> str:
+    """
+    Stable event ID from the normalized URL (or source and title without one)
+
+    Args:
+        url: Article URL
+        title: Event title
+        source_name: Name of the source
+
+    Returns:
+        Hex digest identifying the event
+    """
+    basis = normalize_url(url) or f"{source_name}\n{title}"
+    return hashlib.sha1(basis.encode('utf-8')).hexdigest()
+
+
+def content_hash(title: str, description: str) -> str:
+    """
+    Hash of the raw title and description, used to spot changed stories
+
+    Args:
+        title: Event title
+        description: Description as delivered by the feed (before cleaning)
+
+    Returns:
+        Hex digest of the content
+    """
+    return hashlib.sha1(f"{title}\n{description}".encode('utf-8')).hexdigest()
+
+
+class EventStore:
+    """SQLite-backed incremental store of ranked events"""
+
+    def __init__(self, path: Path, retention_hours: float = 24, max_events: Optional[int] = None,
+                 rules_version: str = ''):
+        """
+        Open (or create) the store
+
+        Args:
+            path: SQLite database file
+            retention_hours: Events not seen for this long are dropped
+            max_events: Cap on events returned by ``load_ranked`` (None for no cap)
+            rules_version: Identifier of the severity rules; stored scores
+                are treated as stale when it changes
+        """
+        self.path = Path(path)
+        self.retention_seconds = retention_hours * 3600
+        self.max_events = max_events
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.executescript(SCHEMA)
+        self._drop_title_keys()
+        self._check_rules_version(rules_version)
+
+    def _drop_title_keys(self) -> None:
+        """Remove the title fingerprint column of stores written before clustering replaced it"""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(events)")}
+        if 'title_key' not in columns:
+            return
+        try:
+            with self.conn:
+                self.conn.execute("ALTER TABLE events DROP COLUMN title_key")
+        except sqlite3.OperationalError:
+            # SQLite before 3.35 cannot drop columns; the store is only a cache
+            logger.info("Rebuilding the event store without title fingerprints")
+            with self.conn:
+                self.conn.execute("DROP TABLE events")
+            self.conn.executescript(SCHEMA)
+
+    def _check_rules_version(self, rules_version: str) -> None:
+        """Invalidate stored content hashes when the ranking rules changed"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'rules_version'").fetchone()
+        if row and row[0] == rules_version:
+            return
+
+        if row:
+            logger.info("Severity rules changed, stored events will be ranked again")
+        with self.conn:
+            self.conn.execute("UPDATE events SET content_hash = ''")
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('rules_version', ?)", (rules_version,)
+            )
+
+    def fingerprints(self) -> Dict[str, Tuple[str, str]]:
+        """
+        Content hash and cleaned description of every stored event
+
+        Passed to ``NewsFetcher`` so unchanged entries skip HTML cleaning.
+
+        Returns:
+            Mapping of event ID to (content hash, cleaned description)
+        """
+        rows = self.conn.execute(
+            "SELECT id, content_hash, json_extract(data, '$.description') FROM events"
+        )
+        return {event_id: (digest, description) for event_id, digest, description in rows}
+
+    def split_changed(self, events: List[Dict], fingerprints: Optional[Dict[str, Tuple[str, str]]] = None
+                      ) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Separate events that need ranking from ones already stored unchanged
+
+        Args:
+            events: Events from ``NewsFetcher.fetch_all``
+            fingerprints: Result of ``fingerprints()`` if already loaded
+
+        Returns:
+            Tuple of (new or changed events, unchanged events)
+        """
+        fingerprints = self.fingerprints() if fingerprints is None else fingerprints
+        known = {event_id: digest for event_id, (digest, _) in fingerprints.items()}
+        # Stories also need ranking again when outlets joined or left them
+        members = dict(self.conn.execute(
+            "SELECT id, json_extract(data, '$.member_hash') FROM events"
+        ))
+        changed, unchanged = [], []
+        for event in events:
+            # Events cached before IDs existed get them here
+            if 'id' not in event:
+                event['id'] = event_key(event.get('url', ''), event.get('title', ''), event.get('source', ''))
+                event['content_hash'] = content_hash(event.get('title', ''), event.get('description', ''))
+            if (event['id'] in known and known[event['id']] == event['content_hash']
+                    and members.get(event['id']) == event.get('member_hash')):
+                unchanged.append(event)
+            else:
+                changed.append(event)
+        return changed, unchanged
+
+    def upsert(self, ranked: List[Dict], unchanged: Iterable[Dict] = (), positions: Optional[Dict[str, int]] = None,
+               retired: Iterable[str] = ()) -> None:
+        """
+        Write newly ranked events and refresh the last-seen time of unchanged ones
+
+        Args:
+            ranked: New or changed events with severity fields
+            unchanged: Events already stored with identical content
+            positions: Event ID to position in this run's fetch order
+            retired: IDs of stored stories that were folded into another story
+        """
+        now = time.time()
+        positions = positions or {}
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO events (id, content_hash, severity_score, first_seen, last_seen, position, data)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    content_hash = excluded.content_hash,
+                    severity_score = excluded.severity_score,
+                    last_seen = excluded.last_seen,
+                    position = excluded.position,
+                    data = excluded.data
+                """,
+                [
+                    (event['id'], event['content_hash'], event['severity_score'], now, now, positions.get(event['id'], 0),
+                     json.dumps(event, ensure_ascii=False, default=event_default))
+                    for event in ranked
+                ]
+            )
+            self.conn.executemany(
+                "UPDATE events SET last_seen = ?, position = ? WHERE id = ?",
+                [(now, positions.get(event['id'], 0), event['id']) for event in unchanged]
+            )
+            self.conn.executemany("DELETE FROM events WHERE id = ?", [(event_id,) for event_id in retired])
+
+    def prune(self) -> int:
+        """
+        Drop events not seen within the retention window
+
+        Returns:
+            Number of events removed
+        """
+        cutoff = time.time() - self.retention_seconds
+        with self.conn:
+            removed = self.conn.execute("DELETE FROM events WHERE last_seen < ?", (cutoff,)).rowcount
+        if removed:
+            logger.info(f"Pruned {removed} events older than the retention window")
+        return removed
+
+    def load_ranked(self) -> List[Dict]:
+        """
+        Load retained events, most severe first
+
+        Copies of a story from other outlets are never stored (see
+        clustering.py). Events stored before publish dates were normalized
+        get ``published``/``published_ts`` here.
+
+        Returns:
+            List of ranked event dictionaries
+        """
+        rows = self.conn.execute(
+            """
+            SELECT first_seen, data FROM events
+            WHERE last_seen >= ?
+            ORDER BY severity_score DESC, last_seen DESC, position ASC, first_seen ASC
+            """,
+            (time.time() - self.retention_seconds,)
+        )
+
+        events = []
+        for first_seen, data in rows:
+            event = Event.from_dict(json.loads(data))
+            if 'published_ts' not in event:
+                event['published'], event['published_ts'] = normalize_published(event.get('published'), first_seen)
+            events.append(event)
+
+        if self.max_events is not None:
+            events = events[:self.max_events]
+        return events
+
+    def close(self) -> None:
+        """Close the database connection"""
+        self.conn.close()
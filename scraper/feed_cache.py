@@ -0,0 +1,139 @@
+"""
+Feed cache module
+Persists HTTP validators (ETag / Last-Modified) and parsed entries per source
+URL so unchanged feeds can be answered with a conditional GET
+"""
+
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import List, Dict, Optional
+from models import Event
+
+logger = logging.getLogger(__name__)
+
+
+class FeedCache:
+    """On-disk validator cache keyed by source URL"""
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialize cache, loading any previous state from disk
+
+        Args:
+            path: JSON file holding the cache; None keeps it in memory only
+        """
+        self.path = Path(path) if path else None
+        self.entries: Dict[str, Dict] = {}
+        self.run_stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        """Load cache contents from disk, starting empty on any problem"""
+        if not self.path or not self.path.exists():
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('entries', {})
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable feed cache {self.path}: {e}")
+            self.entries = {}
+
+    def save(self) -> None:
+        """Write cache contents to disk"""
+        if not self.path:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = {'entries': self.entries}
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+
+    def request_headers(self, url: str) -> Dict[str, str]:
+        """
+        Build conditional request headers for a URL
+
+        Validators are only sent when entries are cached, since a 304 is
+        useless without something to reuse.
+
+        Args:
+            url: Source URL
+
+        Returns:
+            Dictionary of If-None-Match / If-Modified-Since headers
+        """
+        with self._lock:
+            entry = self.entries.get(url)
+        if not entry or entry.get('events') is None:
+            return {}
+
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def get_events(self, url: str, source_name: str) -> List[Dict]:
+        """
+        Return the cached events for a URL after a 304, counting a hit
+
+        Args:
+            url: Source URL
+            source_name: Name of the source
+
+        Returns:
+            Copies of the previously parsed events
+        """
+        with self._lock:
+            entry = self.entries.get(url) or {}
+            self._count(source_name, 'hits')
+            entry['hits'] = entry.get('hits', 0) + 1
+            return [Event.from_dict(event) for event in entry.get('events') or []]
+
+    def store(self, url: str, source_name: str, headers: Dict, events: List[Dict]) -> None:
+        """
+        Remember validators and parsed events after a full download, counting a miss
+
+        Args:
+            url: Source URL
+            source_name: Name of the source
+            headers: Response headers
+            events: Events parsed from the response
+        """
+        with self._lock:
+            self._count(source_name, 'misses')
+            previous = self.entries.get(url, {})
+            etag = headers.get('ETag')
+            last_modified = headers.get('Last-Modified')
+            self.entries[url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                # Without validators the server can never answer 304
+                'events': [dict(event) for event in events] if (etag or last_modified) else None,
+                'hits': previous.get('hits', 0),
+                'misses': previous.get('misses', 0) + 1,
+            }
+
+    def _count(self, source_name: str, key: str) -> None:
+        """Increment a per-run counter (caller holds the lock)"""
+        stats = self.run_stats.setdefault(source_name, {'hits': 0, 'misses': 0})
+        stats[key] += 1
+
+    def reset_stats(self) -> None:
+        """Start a new set of per-run counters (long-running processes call this per cycle)"""
+        with self._lock:
+            self.run_stats = {}
+
+    def log_stats(self) -> None:
+        """Log per-source hit/miss counters for this run"""
+        for source_name, stats in sorted(self.run_stats.items()):
+            logger.info(f"Feed cache {source_name}: {stats['hits']} hit(s), {stats['misses']} miss(es)")
+
+        hits = sum(stats['hits'] for stats in self.run_stats.values())
+        misses = sum(stats['misses'] for stats in self.run_stats.values())
+        logger.info(f"Feed cache totals: {hits} hit(s), {misses} miss(es)")
@@ -3,152 +3,823 @@ News fetcher module
 Handles fetching news from RSS feeds and APIs
 """
 
+import io
+import json
 import logging
+import multiprocessing
+import threading
 import time
 import requests
 import feedparser
-from datetime import datetime
-from typing import List, Dict
-from bs4 import BeautifulSoup
-import re
+from concurrent.futures.process import BrokenProcessPool
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError, as_completed, wait
+from typing import Iterator, List, Dict, Optional, Tuple
+from urllib.parse import urlencode, urljoin, urlparse, urlsplit, urlunsplit, parse_qsl
+from requests.adapters import HTTPAdapter
+from feed_cache import FeedCache
+from event_store import event_key, content_hash
+from html_clean import CleanMemo, clean_html
+from high_water import HighWaterMarks, advance_mark, is_new
+from timestamps import normalize_published, published_timestamp
+from health import SourceHealth
+from metrics import RunMetrics
+from models import Event
 
 logger = logging.getLogger(__name__)
 
+# Defaults for the "fetch" block of sources.json
+DEFAULT_FETCH_SETTINGS = {
+    'mode': 'concurrent',        # "concurrent" or "sequential"
+    'max_workers': 8,            # global cap on in-flight sources
+    'per_host_interval': 1.0,    # min seconds between requests to one host
+    'host_intervals': {},        # per-host overrides of per_host_interval
+    'run_budget_seconds': 120,   # wall-clock budget for a whole fetch_all
+    'connect_timeout': 5,        # seconds to establish a connection
+    'read_timeout': None,        # seconds between bytes; defaults to NewsFetcher.timeout
+    'pool_connections': 10,      # number of hosts kept in the connection pool
+    'pool_maxsize': None,        # keep-alive connections per host; defaults to max_workers
+    'parse_workers': 0,          # processes for parsing and cleaning; 0 parses on the fetch threads
+    'parse_pool_min_bytes': 65536,  # smaller responses parse on the fetch thread even with parse_workers
+    'max_entries': 20,           # entries read per source and run; None reads them all
+}
+
+# Defaults for a source's "pagination" block (API sources only)
+DEFAULT_PAGINATION = {
+    'cursor_field': 'next',      # dotted path of the next cursor (or next page URL) in a response
+    'cursor_param': 'cursor',    # query parameter the cursor is sent back in
+    'max_pages': 10,             # pages read per run at most
+}
+
+# Parse workers start from a clean server process instead of a fork of this
+# one, whose fetch and hedge threads may be holding locks (logging, urllib3)
+PARSE_POOL_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+
+class HostRateLimiter:
+    """Spaces out requests to the same host, leaving other hosts unaffected"""
+
+    def __init__(self, default_interval: float, overrides: Optional[Dict[str, float]] = None):
+        """
+        Initialize rate limiter
+
+        Args:
+            default_interval: Minimum seconds between two requests to one host
+            overrides: Per-host intervals that replace the default
+        """
+        self.default_interval = default_interval
+        self.overrides = overrides or {}
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url: str, deadline: Optional[float] = None) -> bool:
+        """
+        Block until a request to the host of ``url`` is allowed
+
+        Args:
+            url: URL about to be requested
+            deadline: Monotonic time after which the slot is not worth waiting for
+
+        Returns:
+            True if the caller may proceed, False if the slot falls past the deadline
+        """
+        host = urlparse(url).netloc.lower()
+        interval = self.overrides.get(host, self.default_interval)
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            if deadline is not None and slot > deadline:
+                return False
+            self._next_slot[host] = slot + interval
+
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+    def try_acquire(self, url: str) -> bool:
+        """
+        Take a request slot for the host of ``url`` only if one is free now
+
+        Args:
+            url: URL about to be requested
+
+        Returns:
+            True if the caller may proceed, False if it would have to wait
+        """
+        host = urlparse(url).netloc.lower()
+        interval = self.overrides.get(host, self.default_interval)
+
+        with self._lock:
+            now = time.monotonic()
+            if self._next_slot.get(host, now) > now:
+                return False
+            self._next_slot[host] = now + interval
+        return True
+
 
 class NewsFetcher:
     """Fetches news from multiple sources"""
     
-    def __init__(self, config: Dict, timeout: int = 10):
+    def __init__(self, config: Dict, timeout: int = 10, cache: Optional[FeedCache] = None,
+                 known_events: Optional[Dict[str, tuple]] = None, clean_memo: Optional[CleanMemo] = None,
+                 high_water: Optional[HighWaterMarks] = None, metrics: Optional[RunMetrics] = None,
+                 health: Optional[SourceHealth] = None):
         """
         Initialize fetcher with configuration
         
         Args:
             config: Configuration dictionary with sources
             timeout: Request timeout in seconds
+            cache: Validator cache for conditional GETs (optional)
+            known_events: Event ID to (content hash, cleaned description) of
+                stored events; unchanged entries reuse the description
+                instead of being cleaned again (optional)
+            clean_memo: Memo of cleaned descriptions shared across runs (optional)
+            high_water: High-water marks for sources with ``"ingest": "incremental"``
+                (optional; without it those sources read the latest entries)
+            metrics: Timers and counters for the run report (optional)
+            health: Source health records and circuit breakers (optional)
         """
         self.sources = config.get('sources', [])
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.cache = cache
+        self.known_events = known_events or {}
+        self.clean_memo = clean_memo
+        self.high_water = high_water
+        self.metrics = metrics or RunMetrics()
+        self.health = health
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
+        self.settings = {**DEFAULT_FETCH_SETTINGS, **config.get('fetch', {})}
+        self.rate_limiter = HostRateLimiter(
+            self.settings['per_host_interval'],
+            self.settings['host_intervals']
+        )
+        self.session = self._build_session()
+        # Runs the requests of sources with latency history during iter_sources,
+        # so a slow one can be hedged
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+    
+    def _build_session(self) -> requests.Session:
+        """
+        Build the pooled keep-alive session shared by RSS and API sources
+
+        Sources may set ``pool_maxsize`` to get a dedicated pool for their host.
+
+        Returns:
+            Configured requests session
+        """
+        session = requests.Session()
+        session.headers.update({
             'User-Agent': 'CrisisManagementScraper/1.0'
         })
-    
-    def fetch_rss(self, url: str, source_name: str) -> List[Dict]:
+
+        pool_connections = self.settings['pool_connections']
+        pool_maxsize = self.settings['pool_maxsize'] or self.settings['max_workers']
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+        for source in self.sources:
+            if not source.get('pool_maxsize') or not source.get('url'):
+                continue
+            parsed = urlparse(source['url'])
+            session.mount(
+                f"{parsed.scheme}://{parsed.netloc}/",
+                HTTPAdapter(pool_connections=1, pool_maxsize=source['pool_maxsize'])
+            )
+
+        return session
+
+    def _get_timeout(self, source: Optional[Dict] = None) -> tuple:
+        """
+        Resolve the (connect, read) timeout for a source
+
+        A source may set ``timeout`` to a number (read timeout) or to an
+        object with ``connect`` and/or ``read`` keys.
+
+        Args:
+            source: Source entry from sources.json
+
+        Returns:
+            Tuple of connect and read timeouts in seconds
+        """
+        connect = self.settings['connect_timeout']
+        read = self.settings['read_timeout'] or self.timeout
+
+        override = (source or {}).get('timeout')
+        if isinstance(override, dict):
+            connect = override.get('connect', connect)
+            read = override.get('read', read)
+        elif override:
+            read = override
+
+        return (connect, read)
+
+    def _request(self, url: str, timeout: tuple, source_name: str, headers: Optional[Dict] = None,
+                 health_key: Optional[str] = None, deadline: Optional[float] = None) -> requests.Response:
+        """
+        GET a URL, recording metrics and the source's health
+
+        Args:
+            url: URL to request
+            timeout: (connect, read) timeout in seconds
+            source_name: Name of the source
+            headers: Extra request headers (optional)
+            health_key: Key of the health record (defaults to ``url``)
+            deadline: Monotonic time by which the run budget is spent (optional)
+
+        Returns:
+            Response with its body already read
+
+        Raises:
+            requests.RequestException: On network errors and HTTP error statuses
+        """
+        health_key = health_key or url
+        start = time.perf_counter()
+        try:
+            with self.metrics.timer('fetch', source_name):
+                response = self._hedged_get(url, timeout, headers or {}, health_key, source_name, deadline)
+            self.metrics.count('bytes', len(response.content), source_name)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            if self.health:
+                self.health.record_failure(health_key, str(e), source_name)
+            raise
+        if self.health:
+            self.health.record_success(health_key, time.perf_counter() - start, source_name)
+        return response
+
+    def _hedged_get(self, url: str, timeout: tuple, headers: Dict, health_key: str,
+                    source_name: str, deadline: Optional[float] = None) -> requests.Response:
+        """
+        GET a URL, racing a second request when the first is slower than usual
+
+        The hedge goes out once the first request has taken longer than the
+        source's usual (p95) latency; whichever answers first wins. It needs
+        a free rate-limit slot for the host and enough run budget left for
+        another usual latency, otherwise the first request is simply awaited.
+        """
+        hedge_pool = self._hedge_pool
+        delay = self.health.hedge_delay(health_key) if hedge_pool else None
+        if delay is None:
+            return self.session.get(url, timeout=timeout, headers=headers)
+
+        try:
+            first = hedge_pool.submit(self.session.get, url, timeout=timeout, headers=headers)
+        except RuntimeError:
+            # The run ended and its pool was shut down; this is a straggler
+            return self.session.get(url, timeout=timeout, headers=headers)
+        try:
+            return first.result(timeout=delay)
+        except TimeoutError:
+            pass
+
+        if deadline is not None and deadline - time.monotonic() < delay:
+            return first.result()
+        if not self.rate_limiter.try_acquire(url):
+            self.metrics.count('hedge_throttled', source=source_name)
+            return first.result()
+
+        logger.info(f"{source_name} slower than {delay:.1f}s, sending a hedged request")
+        self.metrics.count('hedged', source=source_name)
+        try:
+            second = hedge_pool.submit(self.session.get, url, timeout=timeout, headers=headers)
+        except RuntimeError:
+            return first.result()
+        done, _ = wait((first, second), return_when=FIRST_COMPLETED)
+        winner = done.pop()
+        if winner.exception() is not None:
+            # Fall back to the other request; raises if both failed
+            return (second if winner is first else first).result()
+        return winner.result()
+
+    def _download(self, url: str, timeout: tuple, source_name: str,
+                  deadline: Optional[float] = None) -> requests.Response:
+        """
+        Download a URL through the pooled session
+
+        Args:
+            url: URL to download
+            timeout: (connect, read) timeout in seconds
+            source_name: Name of the source, for metrics
+            deadline: Monotonic time by which the run budget is spent (optional)
+
+        Returns:
+            Response with its body already read (or a bodiless 304)
+        """
+        headers = self.cache.request_headers(url) if self.cache else {}
+        response = self._request(url, timeout, source_name, headers, deadline=deadline)
+        if self.cache:
+            self.metrics.count('cache_hits' if response.status_code == 304 else 'cache_misses', source=source_name)
+        return response
+
+    def _remember(self, url: str, source_name: str, response: requests.Response, events: List[Dict]) -> None:
+        """Store a full response's validators and events in the cache"""
+        if self.cache:
+            self.cache.store(url, source_name, response.headers, events)
+
+    def fetch_rss(self, url: str, source_name: str, timeout: Optional[tuple] = None,
+                  source: Optional[Dict] = None, deadline: Optional[float] = None) -> List[Dict]:
         """
         Fetch events from RSS feed
         
         Args:
             url: RSS feed URL
             source_name: Name of the source
+            timeout: (connect, read) timeout; defaults to the fetcher's
+            source: Source entry, for ``max_entries`` and ``ingest`` (optional)
+            deadline: Monotonic time by which the run budget is spent (optional)
             
         Returns:
             List of event dictionaries
         """
         events = []
+        since = self._high_water_mark(url, source)
         
         try:
             logger.info(f"Fetching RSS from {source_name}: {url}")
-            feed = feedparser.parse(url)
-            
-            if feed.bozo:
-                logger.warning(f"Feed parsing warning for {source_name}: {feed.bozo_exception}")
-            
-            for entry in feed.entries[:20]:  # Limit to 20 most recent
-                event = {
-                    'title': entry.get('title', 'No title'),
-                    'description': self._clean_html(entry.get('summary', entry.get('description', ''))),
-                    'url': entry.get('link', ''),
-                    'published': self._parse_date(entry.get('published', entry.get('updated', ''))),
-                    'source': source_name,
-                    'type': 'rss'
-                }
-                events.append(event)
-            
+            response = self._download(url, timeout or self._get_timeout(), source_name, deadline)
+            if response.status_code == 304:
+                events = self.cache.get_events(url, source_name)
+                logger.info(f"{source_name} not modified, reusing {len(events)} cached events")
+                return events
+
+            events, ingested = self._parse(
+                'rss', response.content, source_name,
+                content_location=response.url,
+                content_type=response.headers.get('Content-Type', ''),
+                since=since,
+                max_entries=self._max_entries(source)
+            )
+            self._advance(url, since, ingested)
+            self._remember(url, source_name, response, events)
             logger.info(f"Fetched {len(events)} events from {source_name}")
             
         except Exception as e:
             logger.error(f"Error fetching RSS from {source_name}: {e}")
+            self.metrics.note_error(source_name, str(e))
         
         return events
     
-    def fetch_api(self, url: str, source_name: str) -> List[Dict]:
+    def fetch_api(self, url: str, source_name: str, timeout: Optional[tuple] = None,
+                  source: Optional[Dict] = None, deadline: Optional[float] = None) -> List[Dict]:
         """
         Fetch events from JSON API
         
+        With a ``pagination`` block on the source, cursor pages are followed
+        until ``max_pages``, ``max_entries`` or (for incremental sources) the
+        high-water mark is reached.
+        
         Args:
             url: API endpoint URL
             source_name: Name of the source
+            timeout: (connect, read) timeout; defaults to the fetcher's
+            source: Source entry, for ``max_entries``, ``ingest`` and
+                ``pagination`` (optional)
+            deadline: Monotonic time by which the run budget is spent (optional)
             
         Returns:
             List of event dictionaries
         """
         events = []
+        since = self._high_water_mark(url, source)
+        limit = self._max_entries(source)
+        pagination = (source or {}).get('pagination')
+        pagination = {**DEFAULT_PAGINATION, **pagination} if pagination else None
         
         try:
             logger.info(f"Fetching API from {source_name}: {url}")
-            response = self.session.get(url, timeout=self.timeout)
-            response.raise_for_status()
-            
-            data = response.json()
-            articles = data.get('articles', data.get('items', []))
+            response = self._download(url, timeout or self._get_timeout(), source_name, deadline)
+            if response.status_code == 304:
+                events = self.cache.get_events(url, source_name)
+                logger.info(f"{source_name} not modified, reusing {len(events)} cached events")
+                return events
             
-            for article in articles[:20]:  # Limit to 20 most recent
-                event = {
-                    'title': article.get('title', 'No title'),
-                    'description': self._clean_html(article.get('description', article.get('content', ''))),
-                    'url': article.get('url', article.get('link', '')),
-                    'published': article.get('publishedAt', article.get('pubDate', '')),
-                    'source': source_name,
-                    'type': 'api'
-                }
-                events.append(event)
+            first_response, ingested, page_url = response, [], url
+            for page in range(pagination['max_pages'] if pagination else 1):
+                if page:
+                    if not self.rate_limiter.acquire(page_url, deadline):
+                        logger.warning(f"Run budget exhausted, stopping {source_name} after {page} page(s)")
+                        self.metrics.count('pages_skipped', source=source_name)
+                        break
+                    response = self._request(page_url, timeout or self._get_timeout(), source_name,
+                                             health_key=url, deadline=deadline)
+                
+                remaining = None if limit is None else limit - len(events)
+                page_events, page_ingested = self._parse(
+                    'api', response.content, source_name, since=since, max_entries=remaining
+                )
+                events.extend(page_events)
+                ingested.extend(page_ingested)
+                
+                if not pagination or (remaining is not None and len(page_events) >= remaining):
+                    break
+                page_url, page_size = self._next_page(url, page_url, response.content, pagination)
+                # A page cut short by the high-water mark means the rest is old
+                if not page_url or (since is not None and len(page_events) < page_size):
+                    break
             
+            self._advance(url, since, ingested)
+            self._remember(url, source_name, first_response, events)
             logger.info(f"Fetched {len(events)} events from {source_name}")
             
         except requests.RequestException as e:
             logger.error(f"Error fetching API from {source_name}: {e}")
+            self.metrics.note_error(source_name, str(e))
         except Exception as e:
             logger.error(f"Unexpected error with {source_name}: {e}")
+            self.metrics.note_error(source_name, str(e))
         
         return events
     
-    def fetch_all(self) -> List[Dict]:
+    def parse_content(self, source_type: str, content: bytes, source_name: str,
+                      content_location: str = '', content_type: str = '',
+                      since: Optional[Dict] = None, max_entries: Optional[int] = 20) -> tuple:
         """
-        Fetch events from all configured sources
-        
+        Turn a downloaded feed body into cleaned events
+
+        This is the CPU-bound half of a fetch; it does no network I/O, so it
+        can run in a parse worker process.
+
+        Args:
+            source_type: "rss" or "api"
+            content: Raw response body
+            source_name: Name of the source
+            content_location: Final URL of the response (RSS only)
+            content_type: Content-Type header of the response (RSS only)
+            since: High-water mark; only entries above it are read (None
+                reads the first ``max_entries`` entries, as listed)
+            max_entries: Maximum number of events (None for no limit)
+
         Returns:
-            List of all events from all sources
+            Tuple of (list of event dictionaries, list of (event ID, publish
+            timestamp) of the entries read, empty when ``since`` is None)
         """
-        all_events = []
-        
-        for source in self.sources:
-            if not source.get('enabled', True):
-                logger.info(f"Skipping disabled source: {source.get('name')}")
-                continue
-            
-            source_type = source.get('type', 'rss').lower()
-            source_name = source.get('name', 'Unknown')
-            url = source.get('url')
+        if source_type == 'rss':
+            # Parse the downloaded bytes only; feedparser must not do its own I/O
+            feed = feedparser.parse(
+                io.BytesIO(content),
+                response_headers={
+                    'content-location': content_location,
+                    'content-type': content_type,
+                }
+            )
             
-            if not url:
-                logger.warning(f"No URL for source: {source_name}")
-                continue
+            if feed.bozo:
+                logger.warning(f"Feed parsing warning for {source_name}: {feed.bozo_exception}")
             
-            if source_type == 'rss':
-                events = self.fetch_rss(url, source_name)
-            elif source_type == 'api':
-                events = self.fetch_api(url, source_name)
+            entries = [
+                (entry.get('title', 'No title'),
+                 entry.get('summary', entry.get('description', '')),
+                 entry.get('link', ''),
+                 entry.get('published', entry.get('updated', '')))
+                for entry in feed.entries
+            ]
+        else:
+            data = json.loads(content)
+            entries = [
+                (article.get('title', 'No title'),
+                 article.get('description', article.get('content', '')),
+                 article.get('url', article.get('link', '')),
+                 article.get('publishedAt', article.get('pubDate', '')))
+                for article in data.get('articles', data.get('items', []))
+            ]
+
+        entries, ingested = self._select_entries(entries, source_name, since, max_entries)
+        events = []
+        # Entries without a readable date are stamped with the fetch time
+        fetched_at = time.time()
+        for title, raw_description, url, published in entries:
+            published, published_ts = self._parse_date(published, fetched_at)
+            event = self._build_event(
+                title=title,
+                raw_description=raw_description,
+                url=url,
+                published=published,
+                published_ts=published_ts,
+                source_name=source_name,
+                source_type=source_type
+            )
+            events.append(event)
+        return events, ingested
+
+    @staticmethod
+    def _select_entries(entries: List[tuple], source_name: str, since: Optional[Dict],
+                        max_entries: Optional[int]) -> tuple:
+        """
+        Pick the entries to read from a parsed feed
+
+        Without a mark the first ``max_entries`` are taken, as listed. With
+        one, only entries above it are kept and, if there are too many, the
+        oldest go first so the next run continues where this one stopped.
+
+        Args:
+            entries: (title, description, url, published) tuples in feed order
+            source_name: Name of the source
+            since: High-water mark or None
+            max_entries: Maximum number of entries (None for no limit)
+
+        Returns:
+            Tuple of (selected entries in feed order, list of (event ID,
+            publish timestamp) of the selected entries)
+        """
+        if since is None:
+            return (entries if max_entries is None else entries[:max_entries]), []
+
+        fresh = []
+        for entry in entries:
+            event_id = event_key(entry[2], entry[0], source_name)
+            timestamp = published_timestamp(entry[3])
+            if is_new(since, event_id, timestamp):
+                fresh.append((entry, event_id, timestamp))
+
+        if max_entries is not None and len(fresh) > max_entries:
+            # Undated entries sort last, after every dated one
+            oldest = sorted(range(len(fresh)), key=lambda i: (fresh[i][2] is None, fresh[i][2] or 0, i))
+            fresh = [fresh[i] for i in sorted(oldest[:max(0, max_entries)])]
+
+        return [entry for entry, _, _ in fresh], [(event_id, timestamp) for _, event_id, timestamp in fresh]
+
+    def _next_page(self, url: str, page_url: str, content: bytes, pagination: Dict) -> tuple:
+        """
+        Find the next page of a paginated API response
+
+        Args:
+            url: Configured source URL
+            page_url: URL of the page just read
+            content: Body of that page
+            pagination: Merged pagination settings
+
+        Returns:
+            Tuple of (next page URL or None, number of articles on the page)
+        """
+        data = json.loads(content)
+        page_size = len(data.get('articles', data.get('items', [])))
+        cursor = data
+        for key in pagination['cursor_field'].split('.'):
+            cursor = cursor.get(key) if isinstance(cursor, dict) else None
+        if cursor in (None, '') or not page_size:
+            return None, page_size
+
+        cursor = str(cursor)
+        if '://' in cursor or cursor.startswith('/'):
+            return urljoin(page_url, cursor), page_size
+
+        parts = urlsplit(url)
+        query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != pagination['cursor_param']]
+        query.append((pagination['cursor_param'], cursor))
+        return urlunsplit(parts._replace(query=urlencode(query))), page_size
+
+    def _max_entries(self, source: Optional[Dict]) -> Optional[int]:
+        """Entries to read from a source per run (None for no limit)"""
+        return (source or {}).get('max_entries', self.settings['max_entries'])
+
+    def _high_water_mark(self, url: str, source: Optional[Dict]) -> Optional[Dict]:
+        """High-water mark of an incremental source, or None to read the latest entries"""
+        if self.high_water is None or (source or {}).get('ingest', 'latest') != 'incremental':
+            return None
+        return self.high_water.get(url)
+
+    def _advance(self, url: str, since: Optional[Dict], ingested: List[tuple]) -> None:
+        """Move an incremental source's high-water mark past the entries just read"""
+        if since is not None and ingested:
+            self.high_water.update(url, advance_mark(since, ingested))
+
+    def _parse(self, source_type: str, content: bytes, source_name: str, content_location: str = '',
+               content_type: str = '', since: Optional[Dict] = None, max_entries: Optional[int] = 20) -> tuple:
+        """Parse a response body, on the parse pool when one is running and the body is large"""
+        args = (source_type, content, source_name, content_location, content_type, since, max_entries)
+        pool = self._parse_pool
+        if pool is not None and len(content) >= self.settings['parse_pool_min_bytes']:
+            try:
+                with self.metrics.timer('parse', source_name):
+                    events, ingested, cleaned, stages = self._submit_parse(pool, args).result()
+            except BrokenProcessPool as e:
+                # A dead worker breaks the whole pool; the next run starts a new one
+                logger.warning(f"Parse workers unavailable ({e}), parsing {source_name} in-process")
+                self.close()
             else:
-                logger.warning(f"Unknown source type '{source_type}' for {source_name}")
-                continue
-            
-            all_events.extend(events)
-            
-            # Rate limiting - be respectful
-            time.sleep(1)
-        
+                self.metrics.merge_stages(stages)
+                if self.clean_memo:
+                    self.clean_memo.merge(cleaned)
+                return events, ingested
+
+        with self.metrics.timer('parse', source_name):
+            return self.parse_content(*args)
+
+    @staticmethod
+    def _submit_parse(pool: ProcessPoolExecutor, args: tuple):
+        """Queue a parse on the pool, raising BrokenProcessPool if it broke or was closed meanwhile"""
+        try:
+            return pool.submit(_parse_in_worker, *args)
+        except RuntimeError as e:
+            raise BrokenProcessPool(str(e)) from e
+
+    def fetch_all(self, sources: Optional[List[Dict]] = None) -> List[Dict]:
+        """
+        Fetch events from all configured sources
+
+        Sources run concurrently (or one after another in "sequential"
+        mode), but the result is always assembled in configuration order,
+        so the output does not depend on which feed answers first.
+
+        Args:
+            sources: Subset of source entries to fetch (defaults to all)
+
+        Returns:
+            List of all events from all sources
+        """
+        results: Dict[int, List[Dict]] = dict(self.iter_sources(sources))
+
+        all_events = []
+        for position in sorted(results):
+            all_events.extend(results[position])
+
         return all_events
-    
+
+    def iter_sources(self, sources: Optional[List[Dict]] = None) -> Iterator[Tuple[int, List[Dict]]]:
+        """
+        Fetch all configured sources, yielding each one as soon as it completes
+
+        Lets callers score and write events before the slowest feed
+        answers. Closing the generator early cancels pending sources.
+
+        Args:
+            sources: Subset of source entries to fetch (defaults to all)
+
+        Yields:
+            Tuples of (position among runnable sources, events of that source)
+        """
+        sources = self.sources if sources is None else sources
+        runnable = [source for source in sources if self._is_runnable(source)]
+        deadline = time.monotonic() + self.settings['run_budget_seconds']
+
+        parse_workers = self.settings['parse_workers']
+        if parse_workers and runnable and self._parse_pool is None:
+            # Kept until close(), so daemon cycles reuse warm workers; processes
+            # only start once a large body is submitted. Workers keep the
+            # fingerprints and memo of this first run: later ones are only a
+            # cache, since cleaning the same raw text gives the same result
+            self._parse_pool = ProcessPoolExecutor(
+                max_workers=parse_workers,
+                mp_context=PARSE_POOL_CONTEXT,
+                initializer=_init_parse_worker,
+                initargs=(self.known_events, dict(self.clean_memo.entries) if self.clean_memo else None)
+            )
+        if self.health is not None and self.health.settings['hedge'] and runnable:
+            self._hedge_pool = ThreadPoolExecutor(
+                max_workers=2 * max(1, self.settings['max_workers']), thread_name_prefix='hedge'
+            )
+        try:
+            if self.settings['mode'] == 'sequential':
+                for index, source in enumerate(runnable):
+                    yield index, self.fetch_source(source, deadline)
+            else:
+                yield from self._fetch_concurrent(runnable, deadline)
+        finally:
+            if self._hedge_pool is not None:
+                # Requests still running finish on their own; nothing new is queued
+                self._hedge_pool.shutdown(wait=False, cancel_futures=True)
+                self._hedge_pool = None
+            if self.cache:
+                self.cache.log_stats()
+
+    def close(self) -> None:
+        """Stop the parse workers; they are started again if the fetcher is reused"""
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=False, cancel_futures=True)
+            self._parse_pool = None
+
+    def fetch_source(self, source: Dict, deadline: Optional[float] = None) -> List[Dict]:
+        """
+        Fetch events from a single source, honouring per-host rate limits
+
+        Args:
+            source: Source entry from sources.json
+            deadline: Monotonic time by which the run budget is spent
+
+        Returns:
+            List of event dictionaries (empty if skipped or failed)
+        """
+        source_type = source.get('type', 'rss').lower()
+        source_name = source.get('name', 'Unknown')
+        url = source.get('url')
+
+        if self.health and not self.health.allow(url, source_name):
+            logger.warning(f"Skipping {source_name}: circuit open after repeated failures")
+            self.metrics.count('circuit_open', source=source_name)
+            return []
+
+        if not self.rate_limiter.acquire(url, deadline):
+            logger.warning(f"Run budget exhausted before fetching {source_name}, skipping")
+            self.metrics.count('skipped', source=source_name)
+            if self.health:
+                # A half-open circuit's probe was never sent; let the next run send it
+                self.health.release(url)
+            return []
+
+        timeout = self._get_timeout(source)
+        if source_type == 'rss':
+            events = self.fetch_rss(url, source_name, timeout, source, deadline)
+        else:
+            events = self.fetch_api(url, source_name, timeout, source, deadline)
+        self.metrics.count('events', len(events), source_name)
+        return events
+
+    def _fetch_concurrent(self, sources: List[Dict], deadline: float) -> Iterator[Tuple[int, List[Dict]]]:
+        """
+        Fetch sources on a bounded thread pool within the run budget
+
+        Args:
+            sources: Runnable source entries
+            deadline: Monotonic time by which the run budget is spent
+
+        Yields:
+            Tuples of (index in ``sources``, events) in completion order
+        """
+        if not sources:
+            return
+
+        workers = max(1, min(self.settings['max_workers'], len(sources)))
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fetch')
+        futures = {
+            executor.submit(self.fetch_source, source, deadline): index
+            for index, source in enumerate(sources)
+        }
+
+        pending = set(futures)
+        try:
+            for future in as_completed(futures, timeout=max(0.0, deadline - time.monotonic())):
+                pending.discard(future)
+                index = futures[future]
+                try:
+                    events = future.result()
+                except Exception as e:
+                    logger.error(f"Unexpected error with {sources[index].get('name', 'Unknown')}: {e}")
+                    events = []
+                yield index, events
+        except TimeoutError:
+            for future in pending:
+                source_name = sources[futures[future]].get('name', 'Unknown')
+                logger.warning(f"Run budget exceeded, dropping {source_name}")
+                self.metrics.count('dropped', source=source_name)
+        finally:
+            # Don't wait for stragglers; pending sources are cancelled outright
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _is_runnable(self, source: Dict) -> bool:
+        """Check that a source is enabled and well-formed"""
+        source_name = source.get('name', 'Unknown')
+
+        if not source.get('enabled', True):
+            logger.info(f"Skipping disabled source: {source_name}")
+            return False
+
+        if not source.get('url'):
+            logger.warning(f"No URL for source: {source_name}")
+            return False
+
+        source_type = source.get('type', 'rss').lower()
+        if source_type not in ('rss', 'api'):
+            logger.warning(f"Unknown source type '{source_type}' for {source_name}")
+            return False
+
+        return True
+
+    def _build_event(self, title: str, raw_description: str, url: str, published: str,
+                     published_ts: int, source_name: str, source_type: str) -> Event:
+        """
+        Build an event from feed fields
+
+        The description is only cleaned when the event is new or its
+        content changed since it was stored.
+
+        Returns:
+            Event with a stable ``id`` and ``content_hash``
+        """
+        event_id = event_key(url, title, source_name)
+        digest = content_hash(title, raw_description or '')
+        known = self.known_events.get(event_id)
+        if known and known[0] == digest and known[1] is not None:
+            description = known[1]
+        else:
+            description = self._clean_html(raw_description)
+
+        return Event(
+            title=title,
+            description=description,
+            url=url,
+            published=published,
+            published_ts=published_ts,
+            source=source_name,
+            type=source_type,
+            id=event_id,
+            content_hash=digest
+        )
+
     def _clean_html(self, text: str) -> str:
         """
         Remove HTML tags and clean text
@@ -159,33 +830,58 @@ class NewsFetcher:
         Returns:
             Clean text without HTML tags
         """
-        if not text:
-            return 'No description available.'
-        
-        # Parse HTML and extract text
-        soup = BeautifulSoup(text, 'html.parser')
-        clean_text = soup.get_text(separator=' ', strip=True)
-        
-        # Remove extra whitespace
-        clean_text = re.sub(r'\s+', ' ', clean_text).strip()
-        
-        return clean_text if clean_text else 'No description available.'
+        with self.metrics.timer('clean'):
+            if self.clean_memo:
+                return self.clean_memo.clean(text)
+            return clean_html(text)
     
-    def _parse_date(self, date_str: str) -> str:
+    def _parse_date(self, date_str: str, fallback: Optional[float] = None) -> tuple:
         """
         Parse and normalize date string
         
         Args:
-            date_str: Date string in various formats
+            date_str: Date string in various formats (RFC 822, ISO 8601, ...)
+            fallback: Timestamp for missing or unreadable dates (defaults to now)
             
         Returns:
-            ISO format date string
+            Tuple of (ISO 8601 UTC string, POSIX timestamp)
         """
-        if not date_str:
-            return datetime.utcnow().isoformat() + "Z"
-        
-        try:
-            # feedparser usually handles this
-            return date_str
-        except Exception:
-            return datetime.utcnow().isoformat() + "Z"
+        return normalize_published(date_str, fallback)
+
+
+# Per-process fetcher used by parse workers, set up by _init_parse_worker
+_worker_fetcher: Optional[NewsFetcher] = None
+
+
+def _init_parse_worker(known_events: Dict[str, tuple], memo_entries: Optional[Dict[str, str]]) -> None:
+    """
+    Prepare a parse worker process
+
+    Args:
+        known_events: Stored event fingerprints, so unchanged entries
+            skip cleaning in the worker too
+        memo_entries: Snapshot of the parent's clean memo (None without one)
+    """
+    global _worker_fetcher
+    memo = None
+    if memo_entries is not None:
+        memo = CleanMemo()
+        memo.entries.update(memo_entries)
+    _worker_fetcher = NewsFetcher({}, known_events=known_events, clean_memo=memo)
+
+
+def _parse_in_worker(source_type: str, content: bytes, source_name: str, content_location: str,
+                     content_type: str, since: Optional[Dict] = None, max_entries: Optional[int] = 20) -> tuple:
+    """
+    Parse one response body in a worker process
+
+    Returns:
+        Tuple of (events, entries read, newly cleaned memo entries,
+        stage timings measured in the worker)
+    """
+    _worker_fetcher.metrics = RunMetrics()
+    events, ingested = _worker_fetcher.parse_content(
+        source_type, content, source_name, content_location, content_type, since, max_entries
+    )
+    memo = _worker_fetcher.clean_memo
+    return events, ingested, memo.drain_new() if memo else {}, _worker_fetcher.metrics.stages()
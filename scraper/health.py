@@ -0,0 +1,241 @@
+"""
+Source health module
+Tracks latency, errors and last success per source or upstream host and
+trips a circuit breaker on repeated failures, with exponential backoff
+and half-open probes
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEALTH_SETTINGS = {
+    'enabled': True,
+    'failure_threshold': 3,      # consecutive failures that open the circuit
+    'base_backoff': 1800,        # seconds a circuit first stays open
+    'max_backoff': 86400,        # longest a circuit stays open
+    'probe_timeout': 120,        # seconds before a half-open probe that never reported may be retried
+    'latency_samples': 50,       # latencies kept per source for percentiles
+    'outcome_window': 20,        # recent attempts the error rate is computed over
+    'hedge': True,               # send a second request when a source is slower than usual
+    'hedge_percentile': 95,      # percentile of past latency after which to hedge
+    'hedge_min_delay': 2.0,      # never hedge sooner than this many seconds
+    'hedge_min_samples': 5,      # latencies needed before hedging a source
+}
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+def _percentile(values, percent: float) -> Optional[float]:
+    """Nearest-rank percentile (None without values)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+class SourceHealth:
+    """Health records and circuit breakers keyed by source URL or host"""
+
+    def __init__(self, path: Optional[Path] = None, settings: Optional[Dict] = None):
+        """
+        Initialize records, loading any previous state from disk
+
+        Args:
+            path: JSON file holding the records; None keeps them in memory only
+            settings: Overrides for DEFAULT_HEALTH_SETTINGS
+        """
+        self.path = Path(path) if path else None
+        self.settings = {**DEFAULT_HEALTH_SETTINGS, **(settings or {})}
+        self.records: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        """Load records from disk, starting empty on any problem"""
+        if not self.path or not self.path.exists():
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.records = json.load(f).get('sources', {})
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable health records {self.path}: {e}")
+            self.records = {}
+
+    def save(self) -> None:
+        """Write records to disk"""
+        if not self.path:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump({'sources': self.records}, f)
+
+    def _record(self, key: str, name: Optional[str]) -> Dict:
+        """Record of a key, created on first use (caller holds the lock)"""
+        record = self.records.get(key)
+        if record is None:
+            record = self.records[key] = {
+                'state': CLOSED, 'latencies': [], 'outcomes': [], 'consecutive_failures': 0,
+                'opened': 0, 'open_until': None, 'probe_started': None,
+                'last_success': None, 'last_failure': None, 'last_error': None,
+            }
+        if name:
+            record['name'] = name
+        return record
+
+    def allow(self, key: str, name: Optional[str] = None) -> bool:
+        """
+        Check whether a request may go out
+
+        An open circuit turns half-open once its backoff has passed and lets
+        a single probe through; the probe's outcome closes or reopens it.
+
+        Args:
+            key: Source URL or upstream host
+            name: Display name for summaries (optional)
+
+        Returns:
+            False while the circuit is open
+        """
+        now = time.time()
+        with self._lock:
+            record = self._record(key, name)
+            if record['state'] == CLOSED:
+                return True
+            if record['state'] == HALF_OPEN:
+                # Another probe is in flight, unless it never reported back
+                started = record['probe_started'] or 0
+                if now - started < self.settings['probe_timeout']:
+                    return False
+            elif now < record['open_until']:
+                return False
+            record['state'] = HALF_OPEN
+            record['probe_started'] = now
+            return True
+
+    def release(self, key: str) -> None:
+        """
+        Hand back a probe taken by ``allow`` when no request was sent after all
+
+        The circuit stays half-open, so the next ``allow`` lets a probe
+        through without waiting for ``probe_timeout``.
+
+        Args:
+            key: Source URL or upstream host
+        """
+        with self._lock:
+            record = self.records.get(key)
+            if record and record['state'] == HALF_OPEN:
+                record['probe_started'] = None
+
+    def record_success(self, key: str, seconds: float, name: Optional[str] = None) -> None:
+        """
+        Record a successful request and close the circuit
+
+        Args:
+            key: Source URL or upstream host
+            seconds: Request latency
+            name: Display name for summaries (optional)
+        """
+        with self._lock:
+            record = self._record(key, name)
+            if record['state'] != CLOSED:
+                logger.info(f"Circuit for {record.get('name', key)} closed after a successful probe")
+            record.update(state=CLOSED, consecutive_failures=0, opened=0, open_until=None,
+                          probe_started=None, last_success=time.time())
+            record['latencies'] = (record['latencies'] + [round(seconds, 4)])[-self.settings['latency_samples']:]
+            record['outcomes'] = (record['outcomes'] + [1])[-self.settings['outcome_window']:]
+
+    def record_failure(self, key: str, error: str, name: Optional[str] = None) -> None:
+        """
+        Record a failed request, opening the circuit when failures pile up
+
+        Each time the circuit opens again without a success in between, the
+        backoff doubles up to ``max_backoff``.
+
+        Args:
+            key: Source URL or upstream host
+            error: Error message
+            name: Display name for summaries (optional)
+        """
+        now = time.time()
+        with self._lock:
+            record = self._record(key, name)
+            record['consecutive_failures'] += 1
+            record.update(last_failure=now, last_error=error, probe_started=None)
+            record['outcomes'] = (record['outcomes'] + [0])[-self.settings['outcome_window']:]
+
+            failed_probe = record['state'] == HALF_OPEN
+            if failed_probe or record['consecutive_failures'] >= self.settings['failure_threshold']:
+                backoff = min(self.settings['base_backoff'] * 2 ** record['opened'], self.settings['max_backoff'])
+                record.update(state=OPEN, opened=record['opened'] + 1, open_until=now + backoff)
+                logger.warning(f"Circuit for {record.get('name', key)} open for {backoff:.0f}s "
+                               f"after {record['consecutive_failures']} consecutive failure(s): {error}")
+
+    def retry_after(self, key: str) -> float:
+        """Seconds until an open circuit lets a probe through (0 if it is not open)"""
+        with self._lock:
+            open_until = self.records.get(key, {}).get('open_until')
+        return max(0.0, open_until - time.time()) if open_until else 0.0
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """
+        Seconds after which a second request should be raced against the first
+
+        Returns:
+            Delay, or None when hedging is off or the source has too little history
+        """
+        if not self.settings['hedge']:
+            return None
+        with self._lock:
+            latencies = list(self.records.get(key, {}).get('latencies', ()))
+        if len(latencies) < self.settings['hedge_min_samples']:
+            return None
+        return max(self.settings['hedge_min_delay'], _percentile(latencies, self.settings['hedge_percentile']))
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        Health of every tracked key
+
+        Returns:
+            Dictionary of key -> state, latency percentiles, error rate and
+            last success/failure
+        """
+        with self._lock:
+            records = {key: dict(record) for key, record in self.records.items()}
+
+        summary = {}
+        for key, record in records.items():
+            outcomes = record['outcomes']
+            summary[key] = {
+                'name': record.get('name', key),
+                'state': record['state'],
+                'p50_seconds': _percentile(record['latencies'], 50),
+                'p95_seconds': _percentile(record['latencies'], 95),
+                'error_rate': round(1 - sum(outcomes) / len(outcomes), 3) if outcomes else None,
+                'consecutive_failures': record['consecutive_failures'],
+                'open_until': record['open_until'],
+                'last_success': record['last_success'],
+                'last_error': record['last_error'],
+            }
+        return summary
+
+    def log_summary(self) -> None:
+        """Log every source that is failing or skipped"""
+        unhealthy = [item for item in self.summary().values()
+                     if item['state'] != CLOSED or item['consecutive_failures']]
+        for item in unhealthy:
+            logger.warning(f"Health {item['name']}: {item['state']}, {item['consecutive_failures']} "
+                           f"consecutive failure(s), error rate {item['error_rate']}, last error: {item['last_error']}")
+        logger.info(f"Source health: {len(self.records) - len(unhealthy)} healthy, {len(unhealthy)} failing")
@@ -0,0 +1,121 @@
+"""
+High-water mark module
+Remembers the newest entry ingested from each incremental source, so later
+runs only read entries published after it
+"""
+
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# IDs of recently ingested entries kept per source; they catch entries
+# without a usable date and entries sharing the newest publish time
+MAX_SEEN_IDS = 500
+
+
+def advance_mark(mark: Dict, ingested: Iterable[Tuple[str, Optional[float]]]) -> Dict:
+    """
+    Move a high-water mark past newly ingested entries
+
+    Args:
+        mark: Previous mark (empty on the first run)
+        ingested: (event ID, publish timestamp or None) of each new entry
+
+    Returns:
+        New mark dictionary
+    """
+    published = mark.get('published')
+    ids = []
+    for event_id, timestamp in ingested:
+        ids.append(event_id)
+        if timestamp is not None and (published is None or timestamp > published):
+            published = timestamp
+    seen = list(dict.fromkeys(ids + list(mark.get('ids', []))))[:MAX_SEEN_IDS]
+    return {'published': published, 'ids': seen}
+
+
+def is_new(mark: Dict, event_id: str, timestamp: Optional[float]) -> bool:
+    """
+    Check whether an entry lies above a high-water mark
+
+    Args:
+        mark: Mark from ``HighWaterMarks.get``
+        event_id: Stable event ID of the entry
+        timestamp: Publish timestamp of the entry (None if unknown)
+
+    Returns:
+        True if the entry has not been ingested yet
+    """
+    if event_id in mark.get('seen', ()):
+        return False
+    published = mark.get('published')
+    return published is None or timestamp is None or timestamp >= published
+
+
+class HighWaterMarks:
+    """On-disk high-water marks keyed by source URL"""
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialize marks, loading any previous state from disk
+
+        Args:
+            path: JSON file holding the marks; None keeps them in memory only
+        """
+        self.path = Path(path) if path else None
+        self.marks: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        """Load marks from disk, starting empty on any problem"""
+        if not self.path or not self.path.exists():
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.marks = json.load(f).get('marks', {})
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable high-water marks {self.path}: {e}")
+            self.marks = {}
+
+    def save(self) -> None:
+        """Write marks to disk"""
+        if not self.path:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump({'marks': self.marks}, f)
+
+    def get(self, url: str) -> Dict:
+        """
+        Mark of a source, ready for ``is_new``
+
+        Args:
+            url: Source URL
+
+        Returns:
+            Dictionary with ``published``, ``ids`` and a ``seen`` set
+            (empty on the first run)
+        """
+        with self._lock:
+            mark = dict(self.marks.get(url, {}))
+        mark['seen'] = frozenset(mark.get('ids', []))
+        return mark
+
+    def update(self, url: str, mark: Dict) -> None:
+        """
+        Replace the mark of a source
+
+        Args:
+            url: Source URL
+            mark: Result of ``advance_mark``
+        """
+        with self._lock:
+            self.marks[url] = {'published': mark.get('published'), 'ids': list(mark.get('ids', []))}
@@ -0,0 +1,242 @@
+"""
+HTML cleaning module
+Turns feed descriptions into plain text without building a BeautifulSoup
+tree for the common cases, with a memo of results across runs
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+from html.entities import name2codepoint
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, Optional
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+EMPTY_DESCRIPTION = 'No description available.'
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# BeautifulSoup keeps the text of these tags in string types that
+# get_text() skips, so documents using them go through the full parse
+UNSUPPORTED_TAGS = frozenset(('script', 'style', 'template', 'rt', 'rp'))
+# Entities BeautifulSoup decodes differently from the stdlib table
+UNSUPPORTED_ENTITIES = frozenset(('lang', 'rang'))
+
+
+class _Unsupported(Exception):
+    """Raised by the stripper for markup it cannot reproduce exactly"""
+
+
+def _safe_codepoint(codepoint: int) -> bool:
+    """Check that BeautifulSoup decodes a numeric reference to chr(codepoint)"""
+    # NUL becomes U+FFFD, 0x80-0x9F are read as windows-1252 and
+    # surrogates are replaced, so those are left to BeautifulSoup
+    return (0 < codepoint < 0x80 or 0xA0 <= codepoint < 0xD800
+            or 0xE000 <= codepoint <= 0x10FFFF)
+
+
+class _TagStripper(HTMLParser):
+    """
+    Streaming text extractor for common feed HTML
+
+    Uses the same tokenizer as BeautifulSoup's html.parser builder and
+    treats every tag as a text boundary, which is what
+    ``get_text(separator=' ', strip=True)`` does once whitespace is
+    collapsed.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.parts = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in UNSUPPORTED_TAGS:
+            raise _Unsupported(tag)
+        self.parts.append(' ')
+
+    def handle_endtag(self, tag):
+        if tag in UNSUPPORTED_TAGS:
+            raise _Unsupported(tag)
+        self.parts.append(' ')
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+    def handle_entityref(self, name):
+        if name in UNSUPPORTED_ENTITIES or name not in name2codepoint:
+            raise _Unsupported(name)
+        self.parts.append(chr(name2codepoint[name]))
+
+    def handle_charref(self, name):
+        try:
+            codepoint = int(name[1:], 16) if name[:1] in ('x', 'X') else int(name)
+        except ValueError:
+            raise _Unsupported(name)
+        if not _safe_codepoint(codepoint):
+            raise _Unsupported(name)
+        self.parts.append(chr(codepoint))
+
+    # Comments, doctypes, CDATA and processing instructions are rare in
+    # descriptions; BeautifulSoup decides what text they contribute
+    def handle_comment(self, data):
+        raise _Unsupported('comment')
+
+    def handle_decl(self, decl):
+        raise _Unsupported('declaration')
+
+    def unknown_decl(self, data):
+        raise _Unsupported('declaration')
+
+    def handle_pi(self, data):
+        raise _Unsupported('processing instruction')
+
+
+def _collapse(text: str) -> str:
+    """Collapse whitespace runs to single spaces and trim"""
+    return WHITESPACE_PATTERN.sub(' ', text).strip()
+
+
+def _soup_text(text: str) -> str:
+    """Reference extraction through a full BeautifulSoup parse"""
+    soup = BeautifulSoup(text, 'html.parser')
+    return _collapse(soup.get_text(separator=' ', strip=True))
+
+
+def clean_html(text: Optional[str]) -> str:
+    """
+    Remove HTML tags and clean text
+
+    Plain text skips parsing entirely, common markup goes through a
+    streaming tag stripper, and anything unusual (comments, scripts,
+    rare entities) falls back to BeautifulSoup. All three paths give
+    the same result as ``get_text(separator=' ', strip=True)``.
+
+    Args:
+        text: Text that may contain HTML
+
+    Returns:
+        Clean text without HTML tags
+    """
+    if not text:
+        return EMPTY_DESCRIPTION
+
+    if '<' not in text and '&' not in text:
+        clean_text = _collapse(text)
+    else:
+        stripper = _TagStripper()
+        try:
+            stripper.feed(text)
+            stripper.close()
+            clean_text = _collapse(''.join(stripper.parts))
+        except _Unsupported:
+            clean_text = _soup_text(text)
+
+    return clean_text if clean_text else EMPTY_DESCRIPTION
+
+
+class CleanMemo:
+    """Bounded LRU of cleaned descriptions keyed by a hash of the raw text"""
+
+    def __init__(self, path: Optional[Path] = None, max_entries: int = 5000):
+        """
+        Initialize memo, loading any previous state from disk
+
+        Args:
+            path: JSON file holding the memo; None keeps it in memory only
+            max_entries: Least recently used entries beyond this are dropped
+        """
+        self.path = Path(path) if path else None
+        self.max_entries = max_entries
+        self.entries: 'OrderedDict[str, str]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Entries cleaned since the last drain_new(), for parse workers
+        self._new: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        """Load memo contents from disk, starting empty on any problem"""
+        if not self.path or not self.path.exists():
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = OrderedDict(json.load(f).get('entries', {}))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable clean memo {self.path}: {e}")
+            self.entries = OrderedDict()
+
+    def save(self) -> None:
+        """Write memo contents to disk"""
+        if not self.path:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump({'entries': self.entries}, f, ensure_ascii=False)
+            self._new = {}
+        logger.info(f"HTML clean memo: {self.hits} hit(s), {self.misses} miss(es)")
+
+    def clean(self, text: Optional[str]) -> str:
+        """
+        Clean a description, reusing the result for text seen before
+
+        Args:
+            text: Text that may contain HTML
+
+        Returns:
+            Clean text without HTML tags
+        """
+        if not text:
+            return EMPTY_DESCRIPTION
+
+        key = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        with self._lock:
+            clean_text = self.entries.get(key)
+            if clean_text is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return clean_text
+
+        clean_text = clean_html(text)
+        with self._lock:
+            self.misses += 1
+            self.entries[key] = clean_text
+            self._new[key] = clean_text
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return clean_text
+
+    def drain_new(self) -> Dict[str, str]:
+        """
+        Take the entries cleaned since the last call
+
+        Returns:
+            Mapping of raw text hash to cleaned text
+        """
+        with self._lock:
+            new, self._new = self._new, {}
+        return new
+
+    def merge(self, entries: Dict[str, str]) -> None:
+        """
+        Add entries cleaned elsewhere (by a parse worker process)
+
+        Args:
+            entries: Result of another memo's ``drain_new()``
+        """
+        with self._lock:
+            self.misses += len(entries)
+            self.entries.update(entries)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
@@ -4,12 +4,28 @@ Main scraper script for Crisis Management Web Scraper
 Fetches news from multiple sources, ranks by severity, and saves to JSON
 """
 
+import argparse
+import hashlib
 import json
 import logging
+import signal
+import threading
 from pathlib import Path
-from datetime import datetime
 from fetcher import NewsFetcher
+from feed_cache import FeedCache
+from html_clean import CleanMemo
+from health import SourceHealth
+from high_water import HighWaterMarks
+from event_store import EventStore
+from clustering import StoryClusterer
 from ranker import SeverityRanker
+from pipeline import run_pipeline, write_events_json
+from compact import write_compact
+from shards import write_shards
+from deltas import DEFAULT_DELTA_SETTINGS, DeltaLog
+from metrics import RunMetrics
+from models import Event
+from scheduler import run_daemon
 
 # Configure logging
 logging.basicConfig(
@@ -34,25 +50,57 @@ def load_config(config_path):
 
 def save_events(events, output_path, extra: dict | None = None):
     """Save events to JSON file with timestamp"""
-    data = {
-        "last_updated": datetime.utcnow().isoformat() + "Z",
-        "event_count": len(events),
-        "events": events
-    }
-    if extra:
-        data.update(extra)
-    
-    # Ensure output directory exists
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    
-    logger.info(f"Saved {len(events)} events to {output_path}")
+    count = write_events_json(events, output_path, extra)
+    logger.info(f"Saved {count} events to {output_path}")
+
+
+def summarize_changes(raw_events, fingerprints, ranked_changes):
+    """
+    New or changed events and highest new severity score per source
+
+    Args:
+        raw_events: Events fetched this cycle, before clustering
+        fingerprints: Event ID to (content hash, ...) from before the cycle:
+            stored events plus the previous poll of the fetched sources
+        ranked_changes: New or changed events after ranking
+
+    Returns:
+        Dictionary of source name -> (changed event count, max severity score or None)
+    """
+    changed = {}
+    for event in raw_events:
+        known = fingerprints.get(event['id'])
+        if not known or known[0] != event['content_hash']:
+            changed[event['source']] = changed.get(event['source'], 0) + 1
+
+    scores = {}
+    for event in ranked_changes:
+        source = event.get('source')
+        scores[source] = max(scores.get(source, event['severity_score']), event['severity_score'])
+    return {source: (count, scores.get(source)) for source, count in changed.items()}
 
 
-def main():
+def save_health(health, metrics):
+    """
+    Persist source health and add its summary to the run report
+
+    Args:
+        health: Source health records (None when health tracking is disabled)
+        metrics: Metrics of the current run
+    """
+    if health is None:
+        return
+    health.save()
+    health.log_summary()
+    metrics.annotate('health', health.summary())
+
+
+def main(argv=None):
     """Main execution function"""
+    parser = argparse.ArgumentParser(description="Crisis Management Web Scraper")
+    parser.add_argument('--daemon', action='store_true',
+                        help='keep running and poll each source on its own adaptive schedule')
+    args = parser.parse_args(argv)
     logger.info("Starting Crisis Management Web Scraper")
     
     # Define paths
@@ -60,31 +108,181 @@ def main():
     sources_config = base_path / "config" / "sources.json"
     severity_config = base_path / "config" / "severity_rules.json"
     output_path = base_path / "data" / "events.json"
+    cache_path = base_path / "data" / "cache" / "feed_cache.json"
+    store_path = base_path / "data" / "cache" / "events.db"
+    clean_memo_path = base_path / "data" / "cache" / "clean_cache.json"
+    high_water_path = base_path / "data" / "cache" / "high_water.json"
+    health_path = base_path / "data" / "cache" / "health.json"
+    deltas_path = base_path / "data" / "deltas"
+    report_path = base_path / "data" / "run_report.json"
+    metrics = RunMetrics()
     
     try:
         # Load configurations
         sources = load_config(sources_config)
         severity_rules = load_config(severity_config)
+        extra = {"ticker_config": severity_rules.get("ticker", {})}
+        feed_cache = FeedCache(cache_path)
+        clean_memo = CleanMemo(clean_memo_path)
+        high_water = HighWaterMarks(high_water_path)
+        delta_settings = {**DEFAULT_DELTA_SETTINGS, **sources.get('deltas', {})}
+        delta_log = DeltaLog(deltas_path, delta_settings['keep']) if delta_settings['enabled'] else None
+        health_settings = sources.get('health', {})
+        health = SourceHealth(health_path, health_settings) if health_settings.get('enabled', True) else None
         
-        # Fetch news from all sources
-        fetcher = NewsFetcher(sources)
-        raw_events = fetcher.fetch_all()
-        logger.info(f"Fetched {len(raw_events)} events from {len(sources.get('sources', []))} sources")
+        pipeline_settings = sources.get('pipeline', {})
+        if pipeline_settings.get('mode') == 'streaming' and args.daemon:
+            # Cycles only fetch the sources that are due, so the store must keep the rest
+            logger.warning("Daemon mode always uses the event store, ignoring the streaming pipeline mode")
+        elif pipeline_settings.get('mode') == 'streaming':
+            # Score events as sources complete and keep only the top K in memory;
+            # clustering and the event store need the whole run, so they are skipped
+            fetcher = NewsFetcher(sources, cache=feed_cache, clean_memo=clean_memo, high_water=high_water,
+                                  metrics=metrics, health=health)
+            ranker = SeverityRanker(severity_rules)
+            # Fetching, scoring and writing overlap here, so they are timed as one stage
+            with metrics.timer('pipeline'):
+                ranked_events = run_pipeline(fetcher, ranker, output_path, pipeline_settings.get('top_k'), extra,
+                                             delta_log)
+            fetcher.close()
+            with metrics.timer('save'):
+                if delta_log:
+                    extra['seq'] = delta_log.current_seq()
+                write_compact(ranked_events, output_path.parent, extra, sources.get('compact'))
+                write_shards(ranked_events, output_path.parent, sources.get('shards'))
+            feed_cache.save()
+            clean_memo.save()
+            high_water.save()
+            save_health(health, metrics)
+            logger.info("Scraping completed successfully")
+            return
         
-        # Rank events by severity
+        store_settings = sources.get('store', {})
+        rules_version = hashlib.sha1(json.dumps(severity_rules, sort_keys=True).encode('utf-8')).hexdigest()
+        # Settings left out of the config take EventStore's defaults
+        store_options = {key: store_settings[key] for key in ('retention_hours', 'max_events') if key in store_settings}
+        store = EventStore(store_path, rules_version=rules_version, **store_options)
+        # Built once, so a daemon keeps warm sessions and compiled rules between cycles
+        fetcher = NewsFetcher(sources, cache=feed_cache, clean_memo=clean_memo, high_water=high_water,
+                              health=health)
+        clusterer = StoryClusterer(sources.get('clustering', {}))
         ranker = SeverityRanker(severity_rules)
-        ranked_events = ranker.rank_events(raw_events)
-        logger.info(f"Ranked {len(ranked_events)} events")
+        # Latest events of every source, so a daemon cycle that polls only a
+        # few sources still clusters their stories with everyone else's
+        latest_events = {}
         
-        # Save to JSON, include ticker config for frontend
-        extra = {"ticker_config": severity_rules.get("ticker", {})}
-        save_events(ranked_events, output_path, extra)
+        def cycle(cycle_metrics, due_sources=None):
+            """Fetch, rank and publish one round of sources; returns summarize_changes()"""
+            fingerprints = store.fingerprints()
+            fetcher.known_events = fingerprints
+            fetcher.metrics = cycle_metrics
+            feed_cache.reset_stats()
+            
+            # Fetch news from the due sources (all of them outside daemon mode)
+            with cycle_metrics.timer('fetch_all'):
+                raw_events = fetcher.fetch_all(due_sources)
+            feed_cache.save()
+            clean_memo.save()
+            high_water.save()
+            save_health(health, cycle_metrics)
+            fetched_sources = sources.get('sources', []) if due_sources is None else due_sources
+            logger.info(f"Fetched {len(raw_events)} events from {len(fetched_sources)} sources")
+            
+            # Copies folded into another outlet's story are never stored, so
+            # the previous poll of their source tells whether they changed
+            previous = {event['id']: (event['content_hash'], None) for source in fetched_sources
+                        for event in latest_events.get(source.get('name', 'Unknown'), ())}
+            
+            # Collapse the same story reported by several outlets; stored
+            # stories keep their ID when other outlets join them
+            with cycle_metrics.timer('cluster'):
+                pool = raw_events if due_sources is None else latest_pool(raw_events, due_sources)
+                stories = clusterer.collapse(pool, fingerprints)
+            # Stored stories that were folded into another one are dropped
+            story_ids = {story['id'] for story in stories}
+            retired = [event['id'] for event in pool if event['id'] in fingerprints and event['id'] not in story_ids]
+            if due_sources is not None:
+                # Stories without a polled source are unchanged and stay as stored
+                due_names = {source.get('name', 'Unknown') for source in due_sources}
+                stories = [story for story in stories
+                           if story['source'] in due_names or due_names.intersection(story.get('also_reported_by', ()))]
+            
+            # Only new or changed events need ranking; the rest are already stored
+            changed_events, unchanged_events = store.split_changed(stories, fingerprints)
+            logger.info(f"{len(changed_events)} new or changed events, {len(unchanged_events)} unchanged")
+            
+            # Rank events by severity
+            with cycle_metrics.timer('rank'):
+                ranked_changes = ranker.rank_events(changed_events)
+            
+            positions = {}
+            for index, event in enumerate(stories):
+                positions.setdefault(event['id'], index)
+            with cycle_metrics.timer('store'):
+                store.upsert(ranked_changes, unchanged_events, positions, retired)
+                store.prune()
+                ranked_events = store.load_ranked()
+            logger.info(f"Ranked {len(ranked_events)} events")
+            
+            with cycle_metrics.timer('save'):
+                # Publish what changed since the last run for delta-polling clients
+                if delta_log:
+                    extra['seq'] = delta_log.record(ranked_events)
+                
+                # Save to JSON, include ticker config for frontend
+                save_events(ranked_events, output_path, extra)
+                write_compact(ranked_events, output_path.parent, extra, sources.get('compact'))
+                write_shards(ranked_events, output_path.parent, sources.get('shards'))
+            
+            return summarize_changes(raw_events, {**fingerprints, **previous}, ranked_changes)
+        
+        def latest_pool(raw_events, due_sources):
+            """Events of a partial fetch together with the latest events of the other sources"""
+            for source in due_sources:
+                latest_events[source.get('name', 'Unknown')] = []
+            for event in raw_events:
+                latest_events.setdefault(event['source'], []).append(event)
+            
+            # Copies in configuration order, so clusters (and their canonical
+            # events) match a run over all sources and held events stay unannotated
+            return [Event.from_dict(event) for source in sources.get('sources', [])
+                    for event in latest_events.get(source.get('name', 'Unknown'), ())]
+        
+        if not args.daemon:
+            cycle(metrics)
+            store.close()
+            fetcher.close()
+            logger.info("Scraping completed successfully")
+            return
+        
+        def daemon_cycle(due_sources):
+            """Run one cycle with its own run report"""
+            cycle_metrics = RunMetrics()
+            try:
+                return cycle(cycle_metrics, due_sources)
+            finally:
+                cycle_metrics.write(report_path)
         
-        logger.info("Scraping completed successfully")
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+        logger.info("Running as a daemon, stop with Ctrl-C or SIGTERM")
+        metrics = None  # each cycle writes its own report
+        try:
+            run_daemon(sources.get('sources', []), daemon_cycle, sources.get('daemon'), stop)
+        finally:
+            store.close()
+            fetcher.close()
         
     except Exception as e:
         logger.error(f"Scraping failed: {e}", exc_info=True)
+        if metrics:
+            metrics.count('run_failures')
         raise
+    finally:
+        # Written on failure too, so a run that blows the cron budget can be diagnosed
+        if metrics:
+            metrics.write(report_path)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,89 @@
+"""
+Keyword matcher module
+Compiles a keyword list once into a single regex that finds every keyword
+occurring in a text in one scan
+"""
+
+import re
+from typing import Dict, FrozenSet, Iterable, Set
+
+
+class KeywordMatcher:
+    """Finds all keywords contained in a text with one regex scan"""
+
+    def __init__(self, keywords: Iterable[str]):
+        """
+        Compile keywords into a matcher
+
+        Matching has the same semantics as ``keyword.lower() in text``:
+        plain substrings, overlaps allowed, each keyword reported once.
+
+        Args:
+            keywords: Keywords to look for (case-insensitive)
+        """
+        terms = {keyword.lower() for keyword in keywords}
+        # An empty keyword is "in" every text
+        self._always: Set[str] = {''} if '' in terms else set()
+        terms.discard('')
+
+        self.terms: FrozenSet[str] = frozenset(terms | self._always)
+        self._pattern = None
+        if terms:
+            # Zero-width lookahead so overlapping matches are all visited
+            self._pattern = re.compile(f"(?=({self._trie_regex(self._build_trie(terms))}))")
+
+        # The longest match at a position implies every term it contains
+        self._implied: Dict[str, FrozenSet[str]] = {
+            term: frozenset(other for other in terms if other in term)
+            for term in terms
+        }
+
+    def find(self, text: str) -> Set[str]:
+        """
+        Find every keyword that occurs in an already lowercased text
+
+        Args:
+            text: Lowercased text to scan
+
+        Returns:
+            Set of matched (lowercased) keywords
+        """
+        found = set(self._always)
+        if self._pattern is None:
+            return found
+
+        implied = self._implied
+        for match in self._pattern.finditer(text):
+            term = match.group(1)
+            if term not in found:
+                found |= implied[term]
+        return found
+
+    @staticmethod
+    def _build_trie(terms: Iterable[str]) -> Dict:
+        """Build a character trie; the '' key marks the end of a term"""
+        trie: Dict = {}
+        for term in terms:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[''] = {}
+        return trie
+
+    @classmethod
+    def _trie_regex(cls, node: Dict) -> str:
+        """
+        Render a trie as a regex that matches the longest term at a position
+
+        Children are tried before ending the term, so the greedy match is
+        the longest keyword starting at the scan position.
+        """
+        branches = [re.escape(char) + cls._trie_regex(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if '' in node:
+            return f"(?:{body})?"
+        return body
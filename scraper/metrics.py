@@ -0,0 +1,192 @@
+"""
+Run metrics module
+Times the stages of a scraper run and counts bytes, events, cache hits
+and failures per source, for a machine-readable run report
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RunMetrics:
+    """Thread-safe timers and counters for one scraper run"""
+
+    def __init__(self):
+        """Start an empty set of metrics"""
+        self.started = datetime.utcnow()
+        self._start = time.perf_counter()
+        self._stages: Dict[str, Dict[str, float]] = {}
+        self._counters: Dict[str, float] = {}
+        self._sources: Dict[str, Dict] = {}
+        self._sections: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def timer(self, stage: str, source: Optional[str] = None) -> Iterator[None]:
+        """
+        Time a block as one call of a stage
+
+        Args:
+            stage: Stage name (fetch, parse, clean, rank, save, ...)
+            source: Source name to also attribute the time to (optional)
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start, source)
+
+    def add_time(self, stage: str, seconds: float, source: Optional[str] = None, calls: int = 1) -> None:
+        """
+        Add time measured elsewhere to a stage
+
+        Args:
+            stage: Stage name
+            seconds: Time spent
+            source: Source name to also attribute the time to (optional)
+            calls: Number of calls the time covers
+        """
+        with self._lock:
+            totals = self._stages.setdefault(stage, {'seconds': 0.0, 'calls': 0})
+            totals['seconds'] += seconds
+            totals['calls'] += calls
+            if source is not None:
+                per_source = self._sources.setdefault(source, {})
+                key = f"{stage}_seconds"
+                per_source[key] = per_source.get(key, 0.0) + seconds
+
+    def count(self, name: str, value: float = 1, source: Optional[str] = None) -> None:
+        """
+        Increment a counter
+
+        Args:
+            name: Counter name (bytes, events, cache_hits, failures, ...)
+            value: Amount to add
+            source: Source name to also attribute the amount to (optional)
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+            if source is not None:
+                per_source = self._sources.setdefault(source, {})
+                per_source[name] = per_source.get(name, 0) + value
+
+    def note_error(self, source: str, message: str) -> None:
+        """Record a source's failure and the last error message"""
+        self.count('failures', source=source)
+        with self._lock:
+            self._sources[source]['error'] = message
+
+    def annotate(self, section: str, value) -> None:
+        """Attach an extra top-level section (e.g. source health) to the report"""
+        with self._lock:
+            self._sections[section] = value
+
+    def stages(self) -> Dict[str, Dict[str, float]]:
+        """Copy of the stage totals, e.g. to ship from a worker process"""
+        with self._lock:
+            return {stage: dict(totals) for stage, totals in self._stages.items()}
+
+    def merge_stages(self, stages: Dict[str, Dict[str, float]], source: Optional[str] = None) -> None:
+        """Add stage totals from ``stages()`` of another instance"""
+        for stage, totals in stages.items():
+            self.add_time(stage, totals['seconds'], source, calls=int(totals['calls']))
+
+    def report(self) -> Dict:
+        """
+        Build the run report
+
+        Returns:
+            Dictionary with run timing, stage totals, counters, per-source
+            figures (sources sorted slowest first) and annotated sections
+        """
+        with self._lock:
+            sources = sorted(self._sources.items(),
+                             key=lambda item: item[1].get('fetch_seconds', 0) + item[1].get('parse_seconds', 0),
+                             reverse=True)
+            return {
+                'started': self.started.isoformat() + "Z",
+                'duration_seconds': time.perf_counter() - self._start,
+                'stages': {stage: dict(totals) for stage, totals in self._stages.items()},
+                'counters': dict(self._counters),
+                'sources': {name: dict(figures) for name, figures in sources},
+                **self._sections,
+            }
+
+    def write(self, path: Path) -> Dict:
+        """
+        Write the run report atomically
+
+        Args:
+            path: Destination JSON file
+
+        Returns:
+            The report written
+        """
+        report = self.report()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+        stages = ', '.join(f"{stage} {totals['seconds']:.2f}s" for stage, totals in report['stages'].items())
+        logger.info(f"Run took {report['duration_seconds']:.2f}s ({stages}); report written to {path}")
+        return report
+
+
+def _label(value: str) -> str:
+    """Escape a Prometheus label value"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _metric_name(name: str) -> str:
+    """Turn a counter name into a valid Prometheus metric name"""
+    return ''.join(c if c.isalnum() or c == '_' else '_' for c in name)
+
+
+def prometheus_text(report: Dict) -> str:
+    """
+    Render a run report in the Prometheus text exposition format
+
+    Args:
+        report: Dictionary from ``RunMetrics.report``
+
+    Returns:
+        Exposition text, one sample per line
+    """
+    lines: List[str] = [
+        '# HELP scraper_run_duration_seconds Wall time of the last scraper run',
+        '# TYPE scraper_run_duration_seconds gauge',
+        f"scraper_run_duration_seconds {report.get('duration_seconds', 0)}",
+        '# HELP scraper_stage_seconds Time spent per stage in the last scraper run',
+        '# TYPE scraper_stage_seconds gauge',
+    ]
+    stages = report.get('stages', {})
+    lines += [f'scraper_stage_seconds{{stage="{_label(stage)}"}} {totals["seconds"]}'
+              for stage, totals in stages.items()]
+    lines += ['# HELP scraper_stage_calls Calls per stage in the last scraper run',
+              '# TYPE scraper_stage_calls gauge']
+    lines += [f'scraper_stage_calls{{stage="{_label(stage)}"}} {totals["calls"]}'
+              for stage, totals in stages.items()]
+
+    for name, value in report.get('counters', {}).items():
+        metric = f"scraper_{_metric_name(name)}"
+        lines += [f'# TYPE {metric} gauge', f'{metric} {value}']
+
+    lines += ['# HELP scraper_source_value Per-source figures of the last scraper run',
+              '# TYPE scraper_source_value gauge']
+    for source, figures in report.get('sources', {}).items():
+        for key, value in figures.items():
+            if isinstance(value, (int, float)):
+                lines.append(f'scraper_source_value{{source="{_label(source)}",metric="{_label(key)}"}} {value}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,230 @@
+"""
+Event model module
+Slotted event records used through the pipeline instead of per-event
+dictionaries, with interned category strings, a derived ticker label and
+serialization to the same JSON as the dictionaries had
+"""
+
+import json
+import sys
+from collections.abc import Mapping, MutableMapping
+from typing import Dict, Iterator, Optional
+
+# Fields in the order they are serialized; the fetcher, clustering and the
+# ranker add them in this order, so output matches the dictionaries
+FIELDS = (
+    'title', 'description', 'url', 'published', 'published_ts', 'source', 'type', 'id', 'content_hash',
+    'source_count', 'member_urls', 'also_reported_by', 'member_hash',
+    'severity_score', 'severity_level', 'is_ticker', 'ticker_category', 'ticker_emoji', 'ticker_label',
+)
+
+# Small vocabularies (source names, rss/api, severity levels, ticker
+# categories and emojis); every event points at one shared string per value
+INTERNED_FIELDS = frozenset(('source', 'type', 'severity_level', 'ticker_category', 'ticker_emoji'))
+
+# Always "<ticker_emoji> <title>", so it is computed instead of stored
+DERIVED_FIELDS = frozenset(('ticker_label',))
+
+_SLOTS = tuple(field for field in FIELDS if field not in DERIVED_FIELDS)
+_SLOT_SET = frozenset(_SLOTS)
+_MISSING = object()
+
+
+def _label(emoji: str, title: str) -> str:
+    """Ticker label of an event"""
+    return f"{emoji} {title}"
+
+
+class Event(MutableMapping):
+    """
+    One event, stored in slots
+
+    Behaves as a mutable mapping with the same keys the event dictionary
+    had, so code written against dictionaries (``event['title']``,
+    ``event.get(...)``, ``dict(event)``) keeps working. Unset slots are
+    absent keys; keys outside the schema go to a small overflow dictionary.
+    """
+
+    __slots__ = _SLOTS + ('_extra',)
+
+    def __init__(self, fields: Optional[Mapping] = None, **kwargs):
+        """
+        Build an event from a mapping and/or keyword fields
+
+        Args:
+            fields: Event dictionary (optional)
+            **kwargs: Further fields
+        """
+        for source in (fields or {}), kwargs:
+            for key, value in source.items():
+                self[key] = value
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> 'Event':
+        """Build an event from an event dictionary"""
+        return cls(data)
+
+    def __getitem__(self, key: str):
+        if key in _SLOT_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        extra = getattr(self, '_extra', None)
+        if extra and key in extra:
+            return extra[key]
+        if key == 'ticker_label' and hasattr(self, 'ticker_emoji'):
+            return _label(self.ticker_emoji, self.get('title', ''))
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value) -> None:
+        if key in _SLOT_SET:
+            if key in INTERNED_FIELDS and type(value) is str:
+                value = sys.intern(value)
+            setattr(self, key, value)
+            return
+        if key == 'ticker_label' and hasattr(self, 'ticker_emoji') \
+                and value == _label(self.ticker_emoji, self.get('title', '')):
+            return
+        extra = getattr(self, '_extra', None)
+        if extra is None:
+            extra = self._extra = {}
+        extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in _SLOT_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+            return
+        extra = getattr(self, '_extra', None)
+        if not extra or key not in extra:
+            raise KeyError(key)
+        del extra[key]
+
+    def get(self, key: str, default=None):
+        if key in _SLOT_SET:
+            return getattr(self, key, default)
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key) -> bool:
+        if key in _SLOT_SET:
+            return hasattr(self, key)
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[str]:
+        for key, _ in self.items():
+            yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.items())
+
+    def items(self):
+        """(key, value) pairs in serialization order"""
+        extra = getattr(self, '_extra', None) or {}
+        for key in FIELDS:
+            if key in _SLOT_SET:
+                try:
+                    yield key, getattr(self, key)
+                except AttributeError:
+                    continue
+            elif key not in extra and hasattr(self, 'ticker_emoji'):
+                yield key, _label(self.ticker_emoji, self.get('title', ''))
+        yield from extra.items()
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Event({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict:
+        """Event as a plain dictionary, in serialization order"""
+        # Same result as dict(self.items()), without a generator step per
+        # field; the derived ticker label is the last field
+        data = {}
+        for key in _SLOTS:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                data[key] = value
+        extra = getattr(self, '_extra', None)
+        if 'ticker_emoji' in data and not (extra and 'ticker_label' in extra):
+            data['ticker_label'] = _label(data['ticker_emoji'], data.get('title', ''))
+        if extra:
+            data.update(extra)
+        return data
+
+    def to_json(self, indent: Optional[int] = None, ensure_ascii: bool = False) -> str:
+        """
+        Serialize the event with the C JSON encoder
+
+        The text equals ``json.dumps(event.to_dict(), indent=indent,
+        ensure_ascii=ensure_ascii)``.
+
+        Args:
+            indent: Indentation as in ``json.dumps`` (None for a single line)
+            ensure_ascii: Escape non-ASCII characters
+
+        Returns:
+            JSON text
+        """
+        return json.dumps(self.to_dict(), indent=indent, ensure_ascii=ensure_ascii)
+
+    def __reduce__(self):
+        # Field values plus a bitmask of the slots that are set, so parse
+        # workers ship no key names
+        present, values = 0, []
+        for position, key in enumerate(_SLOTS):
+            try:
+                values.append(getattr(self, key))
+            except AttributeError:
+                continue
+            present |= 1 << position
+        return _restore, (present, tuple(values), getattr(self, '_extra', None))
+
+
+def _restore(present: int, values: tuple, extra: Optional[Dict]) -> Event:
+    """Unpickle an event"""
+    event = Event()
+    remaining = iter(values)
+    for position, key in enumerate(_SLOTS):
+        if present >> position & 1:
+            event[key] = next(remaining)
+    if extra:
+        event._extra = dict(extra)
+    return event
+
+
+def event_default(value) -> Dict:
+    """``default`` hook for ``json.dump`` that serializes Event objects as dictionaries"""
+    if isinstance(value, Event):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def event_json(event: Mapping, indent: Optional[int] = None) -> str:
+    """
+    Serialize an Event or an event dictionary
+
+    Args:
+        event: Event object or dictionary
+        indent: Indentation as in ``json.dumps``
+
+    Returns:
+        JSON text (non-ASCII characters kept)
+    """
+    if isinstance(event, Event):
+        return event.to_json(indent)
+    return json.dumps(event, indent=indent, ensure_ascii=False, default=event_default)
@@ -0,0 +1,177 @@
+"""
+Streaming pipeline module
+Scores events as each source completes, keeps the most severe ones in a
+bounded heap and writes the output file incrementally
+"""
+
+import heapq
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from models import event_json
+
+logger = logging.getLogger(__name__)
+
+
+def stream_events(fetcher) -> Iterator[Tuple[int, int, Dict]]:
+    """
+    Yield events source by source, as soon as each source completes
+
+    Args:
+        fetcher: ``NewsFetcher`` to pull from
+
+    Yields:
+        Tuples of (source position, index within the source, event), which
+        give the event's place in ``fetch_all`` order
+    """
+    for position, events in fetcher.iter_sources():
+        for index, event in enumerate(events):
+            yield position, index, event
+
+
+def score_stream(events: Iterable[Tuple[int, int, Dict]], ranker) -> Iterator[Tuple[int, int, Dict]]:
+    """
+    Add severity fields to events as they arrive
+
+    Args:
+        events: Tuples from ``stream_events``
+        ranker: ``SeverityRanker`` to score with
+
+    Yields:
+        The same tuples with scored events
+    """
+    for position, index, event in events:
+        yield position, index, ranker.score_event(event)
+
+
+class TopK:
+    """Bounded min-heap keeping the k most severe events seen so far"""
+
+    def __init__(self, k: Optional[int] = None):
+        """
+        Initialize an empty selection
+
+        Args:
+            k: Number of events to keep (None keeps all of them)
+        """
+        self.k = k
+        self.seen = 0
+        self._heap: List[tuple] = []
+
+    def push(self, event: Dict, position: int, index: int) -> None:
+        """
+        Offer a scored event, evicting the least severe one when full
+
+        Args:
+            event: Event with ``severity_score``
+            position: Position of the event's source in the run
+            index: Index of the event within its source
+        """
+        self.seen += 1
+        if self.k is not None and self.k <= 0:
+            return
+
+        # Ties go to the event that comes first in fetch_all order, like the
+        # stable sort in rank_events, whichever source answered first; the
+        # unique order also keeps heapq from ever comparing dictionaries
+        item = (event['severity_score'], (-position, -index), event)
+        if self.k is None or len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+        elif item[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, item)
+
+    def extend(self, events: Iterable[Tuple[int, int, Dict]]) -> 'TopK':
+        """Offer every (position, index, event) tuple of an iterable; returns self"""
+        for position, index, event in events:
+            self.push(event, position, index)
+        return self
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def results(self) -> List[Dict]:
+        """
+        Kept events, most severe first
+
+        Returns:
+            List of event dictionaries in the order ``rank_events`` would give
+        """
+        return [event for _, _, event in sorted(self._heap, reverse=True)]
+
+
+def _indent(text: str, prefix: str) -> str:
+    """Indent every line but the first of a JSON fragment"""
+    return text.replace('\n', '\n' + prefix)
+
+
+def write_events_json(events: Sequence[Dict], output_path: Path, extra: Optional[Dict] = None) -> int:
+    """
+    Write the events file one event at a time
+
+    The layout and key order match ``json.dump(..., indent=2)`` of the
+    events document. The file is written to a temporary name and moved
+    into place, so readers never see a partial file.
+
+    Args:
+        events: Event dictionaries or ``Event`` objects, in output order
+        output_path: Destination JSON file
+        extra: Additional top-level keys (e.g. ``ticker_config``)
+
+    Returns:
+        Number of events written
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
+
+    count = len(events)
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write('{\n')
+        f.write(f'  "last_updated": {json.dumps(datetime.utcnow().isoformat() + "Z")},\n')
+        f.write(f'  "event_count": {count},\n')
+        f.write('  "events": [')
+        for index, event in enumerate(events):
+            f.write(',\n    ' if index else '\n    ')
+            f.write(_indent(event_json(event, indent=2), '    '))
+        f.write('\n  ]' if count else ']')
+        for key, value in (extra or {}).items():
+            f.write(f',\n  {json.dumps(key)}: ')
+            f.write(_indent(json.dumps(value, indent=2, ensure_ascii=False), '  '))
+        f.write('\n}')
+
+    os.replace(tmp_path, output_path)
+    return count
+
+
+def run_pipeline(fetcher, ranker, output_path: Path, top_k: Optional[int] = None,
+                 extra: Optional[Dict] = None, deltas=None) -> List[Dict]:
+    """
+    Fetch, score and write events without materializing the whole run
+
+    Peak memory is bounded by ``top_k`` plus the sources in flight.
+    ``events.json`` is still replaced once, after the last source: a file
+    written part way through would drop the previous run's events of the
+    sources still pending, and its ``seq`` would not match the delta log.
+
+    Args:
+        fetcher: ``NewsFetcher`` to pull from
+        ranker: ``SeverityRanker`` to score with
+        output_path: Destination JSON file
+        top_k: Number of most severe events to keep (None keeps all)
+        extra: Additional top-level keys for the output file
+        deltas: ``DeltaLog`` to record the run in; its sequence number is
+            written as ``seq``
+
+    Returns:
+        The events written, most severe first
+    """
+    selection = TopK(top_k).extend(score_stream(stream_events(fetcher), ranker))
+    ranked = selection.results()
+    if deltas is not None:
+        extra = {**(extra or {}), 'seq': deltas.record(ranked)}
+    write_events_json(ranked, output_path, extra)
+    logger.info(f"Streamed {selection.seen} events, kept the {len(ranked)} most severe")
+    return ranked
@@ -1,110 +1,617 @@
 #!/usr/bin/env python3
+import gzip
+import json
+import math
+import os
+import signal
 import sys
+import threading
+import time
 import urllib.parse
+import zlib
 import requests
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from datetime import datetime, timezone
+from deltas import DeltaLog
+from event_index import IndexedEventsFile
+from health import SourceHealth
+from metrics import prometheus_text
 
-PORT = int(sys.argv[1]) if len(sys.argv) > 1 else 8001
+DEFAULT_PORT = 8001
 USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36'
 TIMEOUT = 6
+# Max requests handled at once; further connections wait in the listen backlog
+MAX_WORKERS = int(os.environ.get('PROXY_MAX_WORKERS', '32'))
+# Keep-alive upstream connections kept per host
+POOL_SIZE = int(os.environ.get('PROXY_POOL_SIZE', '16'))
+# Upper bound on cached response bodies, least recently used evicted first
+CACHE_MAX_BYTES = int(os.environ.get('PROXY_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+# Larger responses are streamed through without being kept for the cache
+CACHE_MAX_ENTRY_BYTES = int(os.environ.get('PROXY_CACHE_MAX_ENTRY_BYTES', str(2 * 1024 * 1024)))
+CHUNK_SIZE = 64 * 1024
+# Upstream calls run in parallel for one /market/batch request, and symbols allowed per request
+BATCH_FANOUT = int(os.environ.get('PROXY_BATCH_FANOUT', '8'))
+BATCH_MAX_SYMBOLS = 50
+# Fields /market/batch can return; symbol is always included
+MARKET_FIELDS = ('name', 'price', 'pct', 'change', 'previousClose', 'currency', 'time')
+DEFAULT_MARKET_FIELDS = ('name', 'price', 'pct')
+# Seconds a successful response stays fresh, per route (0 disables caching)
+ROUTE_TTLS = {
+    '/yahoo/quote': 15,
+    '/yahoo/summary': 60,
+    '/yahoo/chart': 60,
+    '/proxy': 120,
+    '/events/since': 30,
+}
+# Scraper output served by /events/since, and deltas kept before clients get a full snapshot
+DATA_DIR = Path(os.environ.get('PROXY_DATA_DIR', Path(__file__).resolve().parent.parent / 'data'))
+DELTA_KEEP = int(os.environ.get('PROXY_DELTA_KEEP', '48'))
+# Circuit breaker per upstream host: failures in a row that open it, and how long it stays open
+BREAKER_FAILURES = int(os.environ.get('PROXY_BREAKER_FAILURES', '5'))
+BREAKER_BACKOFF = float(os.environ.get('PROXY_BREAKER_BACKOFF', '5'))
+BREAKER_MAX_BACKOFF = float(os.environ.get('PROXY_BREAKER_MAX_BACKOFF', '300'))
+
+
+def _build_session():
+    session = requests.Session()
+    # Only ask for encodings the stdlib can decode for clients that don't accept them
+    session.headers.update({'User-Agent': USER_AGENT, 'Accept-Encoding': 'gzip, deflate'})
+    # pool_block makes callers wait for a free connection instead of opening extras
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, pool_block=True)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+SESSION = _build_session()
+UPSTREAM_HEALTH = SourceHealth(settings={
+    'failure_threshold': BREAKER_FAILURES,
+    'base_backoff': BREAKER_BACKOFF,
+    'max_backoff': BREAKER_MAX_BACKOFF,
+    'probe_timeout': 2 * TIMEOUT,
+    'hedge': False,
+})
+
+
+class CircuitOpenError(Exception):
+    """An upstream host is skipped because its circuit breaker is open"""
+    def __init__(self, host):
+        self.host = host
+        self.retry_after = UPSTREAM_HEALTH.retry_after(host)
+        super().__init__(f'{host} is failing, retry in {self.retry_after:.0f}s')
+
+
+def _upstream_get(url, **kwargs):
+    """GET an upstream URL behind its host's circuit breaker
+
+    Network errors, 5xx and 429 count as failures; any other status means
+    the host is up.
+    """
+    host = urllib.parse.urlsplit(url).netloc
+    if not UPSTREAM_HEALTH.allow(host):
+        raise CircuitOpenError(host)
+    start = time.monotonic()
+    try:
+        resp = SESSION.get(url, timeout=TIMEOUT, **kwargs)
+    except requests.RequestException as e:
+        UPSTREAM_HEALTH.record_failure(host, str(e))
+        raise
+    if resp.status_code >= 500 or resp.status_code == 429:
+        UPSTREAM_HEALTH.record_failure(host, f'HTTP {resp.status_code}')
+    else:
+        UPSTREAM_HEALTH.record_success(host, time.monotonic() - start)
+    return resp
+
+
+class _Flight:
+    """An upstream fetch that concurrent identical requests wait on"""
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ResponseCache:
+    """In-memory TTL cache with byte-bounded LRU eviction and single-flight fetches"""
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expires_at, response)
+        self._inflight = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'evictions': 0}
+
+    def get_or_fetch(self, key, ttl, fetch):
+        """
+        Return (response, cache_status); response is (status, headers, body)
+
+        fetch() may return None when the response could not be buffered;
+        waiting requests then fetch for themselves.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return entry[1], 'HIT'
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self._stats['misses'] += 1
+            else:
+                self._stats['coalesced'] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error:
+                raise flight.error
+            if flight.result is None:
+                return fetch(), 'MISS'
+            return flight.result, 'COALESCED'
+
+        try:
+            flight.result = fetch()
+            if ttl > 0 and flight.result is not None and flight.result[0] == 200:
+                self._store(key, time.monotonic() + ttl, flight.result)
+            return flight.result, 'MISS'
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def _store(self, key, expires_at, response):
+        size = len(response[2])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._bytes -= len(old[1][2])
+            self._entries[key] = (expires_at, response)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted[2])
+                self._stats['evictions'] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._bytes, max_bytes=self.max_bytes)
+
+
+CACHE = ResponseCache()
+DELTAS = DeltaLog(DATA_DIR / 'deltas', keep=DELTA_KEEP)
+EVENTS_INDEX = IndexedEventsFile(DATA_DIR / 'events.json')
+BATCH_EXECUTOR = ThreadPoolExecutor(max_workers=BATCH_FANOUT, thread_name_prefix='market')
+
+
+def _chart_url(symbol):
+    return f'https://query1.finance.yahoo.com/v8/finance/chart/{urllib.parse.quote(symbol)}'
+
+
+def _fetch_json(url, route):
+    """Fetch an upstream JSON document through the response cache"""
+    def fetch():
+        resp = _upstream_get(url)
+        return resp.status_code, {'Content-Type': resp.headers.get('Content-Type', 'application/json')}, resp.content
+
+    (status, headers, body), _ = CACHE.get_or_fetch(url, ROUTE_TTLS.get(route, 0), fetch)
+    if status != 200:
+        raise ValueError(f'upstream returned {status}')
+    if headers.get('Content-Encoding'):
+        body = _decode_body(body, headers['Content-Encoding'])
+    return json.loads(body)
+
+
+def _market_quote(symbol, fields):
+    """Reduce a Yahoo chart document to the compact quote the ticker renders"""
+    data = _fetch_json(_chart_url(symbol), '/yahoo/chart')
+    results = (data.get('chart') or {}).get('result') or []
+    if not results:
+        raise ValueError('no chart data')
+    meta = results[0].get('meta') or {}
+
+    price = meta.get('regularMarketPrice')
+    previous = meta.get('chartPreviousClose', meta.get('previousClose'))
+    change = round(price - previous, 4) if price is not None and previous else None
+    values = {
+        'name': meta.get('longName') or meta.get('shortName') or symbol,
+        'price': price,
+        'pct': round(change / previous * 100, 2) if change is not None else None,
+        'change': change,
+        'previousClose': previous,
+        'currency': meta.get('currency'),
+        'time': meta.get('regularMarketTime'),
+    }
+    quote = {'symbol': symbol}
+    quote.update((field, values[field]) for field in fields)
+    return quote
+
+
+def market_batch(symbols, fields):
+    """Fetch many symbols concurrently and merge them into one document"""
+    unique = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+    futures = [(symbol, BATCH_EXECUTOR.submit(_market_quote, symbol, fields)) for symbol in unique]
+
+    quotes, errors = [], {}
+    for symbol, future in futures:
+        try:
+            quotes.append(future.result())
+        except Exception as e:
+            errors[symbol] = str(e)
+    result = {'quotes': quotes}
+    if errors:
+        result['errors'] = errors
+    return result
+
+
+def metrics_text():
+    """Prometheus text for the response cache and the last scraper run report"""
+    stats = CACHE.stats()
+    lines = ['# HELP proxy_cache_events_total Response cache lookups by outcome',
+             '# TYPE proxy_cache_events_total counter']
+    lines += [f'proxy_cache_events_total{{outcome="{name}"}} {stats[name]}'
+              for name in ('hits', 'misses', 'coalesced', 'evictions')]
+    lines += ['# TYPE proxy_cache_entries gauge', f'proxy_cache_entries {stats["entries"]}',
+              '# TYPE proxy_cache_bytes gauge', f'proxy_cache_bytes {stats["bytes"]}']
+    lines += ['# HELP proxy_upstream_circuit_open Whether requests to an upstream host are being skipped',
+              '# TYPE proxy_upstream_circuit_open gauge']
+    lines += [f'proxy_upstream_circuit_open{{host="{host}"}} {int(item["state"] != "closed")}'
+              for host, item in UPSTREAM_HEALTH.summary().items()]
+    text = '\n'.join(lines) + '\n'
+    try:
+        with open(DATA_DIR / 'run_report.json', 'r', encoding='utf-8') as f:
+            text += prometheus_text(json.load(f))
+    except (OSError, ValueError):
+        pass  # no scraper run yet
+    return text
+
+
+def _query_time(value):
+    """POSIX timestamp from an ISO 8601 time (naive times are UTC)"""
+    parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def query_events(index, qs):
+    """Run an /events/query request against the in-memory event index"""
+    def values(name):
+        return [v.strip() for v in ','.join(qs.get(name, [])).split(',') if v.strip()]
+
+    since = _query_time(qs['since'][0]) if qs.get('since') else None
+    until = _query_time(qs['until'][0]) if qs.get('until') else None
+    if qs.get('hours'):
+        since = max(since or 0, time.time() - float(qs['hours'][0]) * 3600)
+    sort = qs.get('sort', ['rank'])[0]
+    if sort not in ('rank', 'time'):
+        raise ValueError('sort must be rank or time')
+
+    result = index.query(
+        text=' '.join(qs.get('q', [])),
+        categories=values('category'),
+        severities=values('severity'),
+        sources=values('source'),
+        since=since,
+        until=until,
+        sort=sort,
+        offset=int(qs.get('offset', ['0'])[0]),
+        limit=int(qs.get('limit', ['50'])[0]),
+    )
+    result['last_updated'] = EVENTS_INDEX.document.get('last_updated')
+    result['seq'] = EVENTS_INDEX.document.get('seq')
+    return result
+
+
+def events_since(seq):
+    """Merged deltas after seq, or the full events.json when the client is too far behind"""
+    delta = DELTAS.since(seq)
+    if delta is not None:
+        delta['full'] = False
+        return delta
+    with open(DATA_DIR / 'events.json', 'r', encoding='utf-8') as f:
+        snapshot = json.load(f)
+    snapshot['full'] = True
+    snapshot.setdefault('seq', 0)
+    return snapshot
+
+
+class ProxyServer(ThreadingHTTPServer):
+    """Threaded server with a cap on concurrent requests and graceful close"""
+    daemon_threads = False
+    request_queue_size = 128  # dashboard refreshes open many connections at once
+    block_on_close = True  # server_close() waits for in-flight requests
+
+    def __init__(self, server_address, handler_class, max_workers=MAX_WORKERS):
+        super().__init__(server_address, handler_class)
+        self._slots = threading.BoundedSemaphore(max_workers)
+
+    def process_request(self, request, client_address):
+        self._slots.acquire()
+        try:
+            super().process_request(request, client_address)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self._slots.release()
+
+
+def _accepts_encoding(accept_encoding, encoding):
+    accepted = [part.split(';')[0].strip().lower() for part in (accept_encoding or '').split(',')]
+    return encoding.lower() in accepted or '*' in accepted
+
+
+def _decode_body(body, encoding):
+    encoding = encoding.lower()
+    if encoding in ('gzip', 'x-gzip'):
+        return gzip.decompress(body)
+    if encoding == 'deflate':
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    return body
+
 
 class ProxyHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps browser connections alive and allows chunked streaming;
+    # every response therefore needs a Content-Length or chunked encoding
+    protocol_version = 'HTTP/1.1'
+    # Close idle keep-alive connections so they don't hold a worker slot
+    timeout = 15
+
     def _send_cors_headers(self):
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', '*')
 
+    def _send_json(self, status, body: bytes, headers=None):
+        self.send_response(status)
+        self._send_cors_headers()
+        self.send_header('Content-Type', 'application/json')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
     def do_OPTIONS(self):
         self.send_response(204)
         self._send_cors_headers()
+        self.send_header('Content-Length', '0')
         self.end_headers()
 
     def do_GET(self):
         parsed = urllib.parse.urlparse(self.path)
         if parsed.path == '/health':
+            health = {'status': 'ok', 'cache': CACHE.stats(), 'upstreams': UPSTREAM_HEALTH.summary()}
+            self._send_json(200, json.dumps(health).encode('utf-8'))
+            return
+        if parsed.path == '/metrics':
+            body = metrics_text().encode('utf-8')
             self.send_response(200)
             self._send_cors_headers()
-            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
             self.end_headers()
-            self.wfile.write(b'{"status":"ok"}')
+            self.wfile.write(body)
             return
         if parsed.path == '/proxy':
             qs = urllib.parse.parse_qs(parsed.query)
             url = qs.get('url', [''])[0]
             if not url:
-                self.send_response(400)
-                self._send_cors_headers()
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                self.wfile.write(b'{"error":"missing url"}')
+                self._send_json(400, b'{"error":"missing url"}')
+                return
+            self._forward(url, '/proxy', default_type='application/octet-stream')
+            return
+        if parsed.path == '/market/batch':
+            qs = urllib.parse.parse_qs(parsed.query)
+            symbols = ','.join(qs.get('symbols', [])).split(',')
+            requested = [f for f in ','.join(qs.get('fields', [])).split(',') if f]
+            fields = tuple(dict.fromkeys(requested)) or DEFAULT_MARKET_FIELDS
+            unknown = [f for f in fields if f not in MARKET_FIELDS]
+            if not any(s.strip() for s in symbols):
+                self._send_json(400, b'{"error":"missing symbols"}')
                 return
+            if unknown:
+                self._send_json(400, json.dumps({'error': 'unknown fields', 'fields': unknown}).encode('utf-8'))
+                return
+            if len(set(s.strip().upper() for s in symbols if s.strip())) > BATCH_MAX_SYMBOLS:
+                self._send_json(400, json.dumps({'error': f'at most {BATCH_MAX_SYMBOLS} symbols'}).encode('utf-8'))
+                return
+            body = json.dumps(market_batch(symbols, fields), separators=(',', ':')).encode('utf-8')
+            self._send_json(200, body)
+            return
+        if parsed.path == '/events/since':
+            qs = urllib.parse.parse_qs(parsed.query)
             try:
-                resp = requests.get(url, headers={'User-Agent': USER_AGENT}, timeout=TIMEOUT)
-                content_type = resp.headers.get('Content-Type', 'application/octet-stream')
-                self.send_response(resp.status_code)
-                self._send_cors_headers()
-                self.send_header('Content-Type', content_type)
-                self.end_headers()
-                self.wfile.write(resp.content)
-            except Exception as e:
-                self.send_response(502)
-                self._send_cors_headers()
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                msg = ('{"error":"upstream fetch failed","detail":' +
-                       '"' + str(e).replace('"','') + '"}')
-                self.wfile.write(msg.encode('utf-8'))
+                seq = int(qs.get('seq', [''])[0])
+            except ValueError:
+                self._send_json(400, b'{"error":"seq must be an integer"}')
+                return
+            self._send_events_since(seq)
+            return
+        if parsed.path == '/events/query':
+            qs = urllib.parse.parse_qs(parsed.query)
+            try:
+                index = EVENTS_INDEX.get()
+            except (OSError, ValueError) as e:
+                self._send_json(503, json.dumps({'error': 'events unavailable', 'detail': str(e)}).encode('utf-8'))
+                return
+            try:
+                result = query_events(index, qs)
+            except ValueError as e:
+                self._send_json(400, json.dumps({'error': str(e)}).encode('utf-8'))
+                return
+            self._send_json(200, json.dumps(result, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
             return
         # Simple helpers mapped to Yahoo endpoints
         if parsed.path.startswith('/yahoo/quote'):
             qs = urllib.parse.parse_qs(parsed.query)
             symbols = qs.get('symbols', [''])[0]
             url = f'https://query1.finance.yahoo.com/v7/finance/quote?symbols={urllib.parse.quote(symbols)}'
-            self._forward(url)
+            self._forward(url, '/yahoo/quote')
             return
         if parsed.path.startswith('/yahoo/summary'):
             qs = urllib.parse.parse_qs(parsed.query)
             symbol = qs.get('symbol', [''])[0]
             url = f'https://query2.finance.yahoo.com/v10/finance/quoteSummary/{urllib.parse.quote(symbol)}?modules=price'
-            self._forward(url)
+            self._forward(url, '/yahoo/summary')
             return
         if parsed.path.startswith('/yahoo/chart'):
             qs = urllib.parse.parse_qs(parsed.query)
             symbol = qs.get('symbol', [''])[0]
-            url = f'https://query1.finance.yahoo.com/v8/finance/chart/{urllib.parse.quote(symbol)}'
-            self._forward(url)
+            self._forward(_chart_url(symbol), '/yahoo/chart')
             return
         # 404
-        self.send_response(404)
-        self._send_cors_headers()
-        self.send_header('Content-Type', 'application/json')
-        self.end_headers()
-        self.wfile.write(b'{"error":"not found"}')
+        self._send_json(404, b'{"error":"not found"}')
 
-    def _forward(self, url: str):
+    def _forward(self, url: str, route: str, default_type: str = 'application/json'):
         try:
-            resp = requests.get(url, headers={'User-Agent': USER_AGENT}, timeout=TIMEOUT)
-            content_type = resp.headers.get('Content-Type', 'application/json')
-            self.send_response(resp.status_code)
-            self._send_cors_headers()
-            self.send_header('Content-Type', content_type)
-            self.end_headers()
-            self.wfile.write(resp.content)
+            response, cache_status = CACHE.get_or_fetch(
+                url, ROUTE_TTLS.get(route, 0), lambda: self._relay(url, default_type)
+            )
+            # A MISS has already been streamed to the client by _relay
+            if cache_status != 'MISS':
+                self._send_buffered(response, cache_status)
+        except CircuitOpenError as e:
+            body = json.dumps({'error': 'upstream unavailable', 'detail': str(e)}).encode('utf-8')
+            self._send_json(503, body, {'Retry-After': str(max(1, math.ceil(e.retry_after)))})
         except Exception as e:
-            self.send_response(502)
-            self._send_cors_headers()
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
             msg = ('{"error":"upstream fetch failed","detail":' +
                    '"' + str(e).replace('"','') + '"}')
-            self.wfile.write(msg.encode('utf-8'))
+            self._send_json(502, msg.encode('utf-8'))
+
+    def _send_events_since(self, seq: int):
+        def build():
+            body = json.dumps(events_since(seq), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            return 200, {'Content-Type': 'application/json', 'Content-Encoding': 'gzip'}, gzip.compress(body)
+
+        try:
+            # Keyed by the current sequence too, so a new scraper run is never hidden by the cache
+            key = f'/events/since?seq={seq}&current={DELTAS.current_seq()}'
+            response, cache_status = CACHE.get_or_fetch(key, ROUTE_TTLS['/events/since'], build)
+            self._send_buffered(response, cache_status)
+        except (OSError, ValueError) as e:
+            self._send_json(503, json.dumps({'error': 'events unavailable', 'detail': str(e)}).encode('utf-8'))
+
+    def _relay(self, url: str, default_type: str):
+        """Stream an upstream response to the client as it arrives.
+
+        Compressed bodies are passed through untouched when the client
+        accepts the encoding. Returns (status, headers, body) for the cache,
+        or None if the body was too large to keep or the stream broke.
+        """
+        resp = _upstream_get(url, stream=True)
+        try:
+            encoding = resp.headers.get('Content-Encoding', '')
+            passthrough = not encoding or _accepts_encoding(self.headers.get('Accept-Encoding'), encoding)
+            headers = {'Content-Type': resp.headers.get('Content-Type', default_type)}
+            if encoding:
+                headers['Content-Encoding'] = encoding
+
+            self.send_response(resp.status_code)
+            self._send_cors_headers()
+            self.send_header('Content-Type', headers['Content-Type'])
+            self.send_header('Vary', 'Accept-Encoding')
+            self.send_header('X-Cache', 'MISS')
+            length = resp.headers.get('Content-Length') if passthrough else None
+            if passthrough and encoding:
+                self.send_header('Content-Encoding', encoding)
+            if length:
+                self.send_header('Content-Length', length)
+            else:
+                self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+
+            if passthrough:
+                chunks = resp.raw.stream(CHUNK_SIZE, decode_content=False)
+            else:
+                # Client can't take the upstream encoding, so decode on the fly
+                headers.pop('Content-Encoding', None)
+                chunks = resp.iter_content(CHUNK_SIZE)
+
+            kept, kept_bytes = [], 0
+            try:
+                for chunk in chunks:
+                    if not chunk:
+                        continue
+                    if length:
+                        self.wfile.write(chunk)
+                    else:
+                        self.wfile.write(b'%X\r\n%s\r\n' % (len(chunk), chunk))
+                    if kept is not None:
+                        kept_bytes += len(chunk)
+                        if kept_bytes <= CACHE_MAX_ENTRY_BYTES:
+                            kept.append(chunk)
+                        else:
+                            kept = None
+                if not length:
+                    self.wfile.write(b'0\r\n\r\n')
+            except Exception as e:
+                # Headers are already out; all we can do is drop the connection
+                self.log_error('stream from %s broken: %s', url, e)
+                self.close_connection = True
+                return None
+
+            if kept is None:
+                return None
+            return resp.status_code, headers, b''.join(kept)
+        finally:
+            resp.close()
+
+    def _send_buffered(self, response, cache_status):
+        status, headers, body = response
+        encoding = headers.get('Content-Encoding')
+        if encoding and not _accepts_encoding(self.headers.get('Accept-Encoding'), encoding):
+            body = _decode_body(body, encoding)
+            encoding = None
+
+        self.send_response(status)
+        self._send_cors_headers()
+        self.send_header('Content-Type', headers['Content-Type'])
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('X-Cache', cache_status)
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _install_shutdown_handler(httpd):
+    # shutdown() blocks until serve_forever() returns, so call it off the main thread
+    def handle(signum, frame):
+        threading.Thread(target=httpd.shutdown, daemon=True).start()
+    signal.signal(signal.SIGTERM, handle)
+
 
 if __name__ == '__main__':
+    PORT = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
     # Bind to IPv4 localhost to avoid IPv6/localhost resolution issues
-    httpd = HTTPServer(('127.0.0.1', PORT), ProxyHandler)
-    print(f'Local proxy running on http://127.0.0.1:{PORT}')
+    httpd = ProxyServer(('127.0.0.1', PORT), ProxyHandler)
+    _install_shutdown_handler(httpd)
+    print(f'Local proxy running on http://127.0.0.1:{PORT} (max {MAX_WORKERS} concurrent requests)')
     try:
         httpd.serve_forever()
     except KeyboardInterrupt:
         pass
+    # Waits for in-flight requests to finish before closing
     httpd.server_close()
+    BATCH_EXECUTOR.shutdown(wait=True)
+    SESSION.close()
@@ -3,12 +3,36 @@ Severity ranking module
 Analyzes events and assigns severity scores
 """
 
+import heapq
 import logging
 import re
-from typing import List, Dict
+from typing import List, Dict, Optional, Sequence
+from matcher import KeywordMatcher
 
 logger = logging.getLogger(__name__)
 
+# Death/casualty patterns, compiled once
+CASUALTY_PATTERNS = [
+    re.compile(r'(\d+)\s*(?:dead|killed|deaths|casualties|fatalities)', re.IGNORECASE),
+    re.compile(r'(?:dead|killed|deaths):\s*(\d+)', re.IGNORECASE),
+    re.compile(r'death toll:?\s*(\d+)', re.IGNORECASE)
+]
+DIGIT_PATTERN = re.compile(r'\d')
+PERCENT_PATTERN = re.compile(r"(-?\d{1,3})\s*%")
+TICKER_CASUALTY_PATTERN = re.compile(r"(?:dead|killed|deaths|casualties|fatalities)\s*:?\s*(\d+)")
+
+# Ticker categories in priority order: (category, default emoji, keyword
+# lists that must all hit, casualty threshold (OR), percent threshold (AND))
+TICKER_CATEGORIES = [
+    ('airline_disaster', '✈️', ('keywords_any', 'context_any'), None, None),
+    ('natural_disaster', '🌪️', ('keywords_any',), None, None),
+    ('war', '🪖', ('keywords_any',), None, None),
+    ('terrorism', '💥', ('keywords_any',), None, None),
+    ('active_shooter', '🚨', ('keywords_any',), None, None),
+    ('mass_casualty', '🚑', ('keywords_any',), ('casualty_threshold', 10), None),
+    ('stock_swing', '📈', ('finance_keywords',), None, ('percent_threshold', 50)),
+]
+
 
 class SeverityRanker:
     """Ranks events by severity using configurable rules"""
@@ -24,40 +48,110 @@ class SeverityRanker:
         self.geographic_scope = config.get('geographic_scope', {})
         self.default_score = config.get('default_score', 1)
         self.ticker = config.get('ticker', {})
+        self.corroboration = config.get('corroboration', {})
+        
+        # Compile scoring and ticker rules once into a single-pass matcher
+        self.term_weights = self._compile_term_weights()
+        self.ticker_rules = self._compile_ticker_rules()
+        ticker_terms = {term for rule in self.ticker_rules for group in rule['groups'] for term in group}
+        self.matcher = KeywordMatcher(set(self.term_weights) | ticker_terms)
     
-    def calculate_severity(self, event: Dict) -> int:
+    def _compile_term_weights(self) -> Dict[str, int]:
+        """
+        Fold keyword and geographic scope rules into one weight per term
+        
+        A term listed in several categories (or twice in one) scores for
+        every listing, exactly as the per-keyword scan did.
+        
+        Returns:
+            Mapping of lowercased term to total weight
+        """
+        weights: Dict[str, int] = {}
+        
+        for category, keywords in self.keywords.items():
+            weight = self._get_keyword_weight(category)
+            for keyword in keywords:
+                term = keyword.lower()
+                weights[term] = weights.get(term, 0) + weight
+        
+        for scope, keywords in self.geographic_scope.items():
+            weight = self._get_scope_weight(scope)
+            for keyword in keywords:
+                term = keyword.lower()
+                weights[term] = weights.get(term, 0) + weight
+        
+        return weights
+    
+    def _compile_ticker_rules(self) -> List[Dict]:
+        """
+        Compile the ticker category table into prioritized rules
+        
+        Categories missing from the config are left out, as before.
+        
+        Returns:
+            List of rule dictionaries in priority order
+        """
+        cfg = self.ticker.get('categories', {})
+        rules = []
+        
+        for category, emoji, groups, casualty, percent in TICKER_CATEGORIES:
+            rule_cfg = cfg.get(category, {})
+            if not rule_cfg:
+                continue
+            rules.append({
+                'category': category,
+                'emoji': rule_cfg.get('emoji', emoji),
+                'groups': [frozenset(w.lower() for w in rule_cfg.get(key, [])) for key in groups],
+                'casualty_threshold': rule_cfg.get(*casualty) if casualty else None,
+                'percent_threshold': rule_cfg.get(*percent) if percent else None,
+            })
+        
+        return rules
+    
+    def _scan(self, event: Dict) -> tuple:
+        """
+        Build the normalized text of an event and scan it once
+        
+        Args:
+            event: Event dictionary
+            
+        Returns:
+            Tuple of (lowercased text, set of matched terms)
+        """
+        text = f"{event.get('title', '')} {event.get('description', '')}".lower()
+        return text, self.matcher.find(text)
+    
+    def calculate_severity(self, event: Dict, scan: tuple = None) -> int:
         """
         Calculate severity score for an event
         
         Args:
             event: Event dictionary
+            scan: Result of ``_scan`` for the event, if already computed
             
         Returns:
             Severity score (higher = more severe)
         """
         score = self.default_score
-        text = f"{event.get('title', '')} {event.get('description', '')}".lower()
+        text, hits = scan or self._scan(event)
         
-        # Score based on keywords
-        for category, keywords in self.keywords.items():
-            for keyword in keywords:
-                if keyword.lower() in text:
-                    weight = self._get_keyword_weight(category)
-                    score += weight
-                    logger.debug(f"Keyword '{keyword}' ({category}) found, +{weight} score")
-        
-        # Score based on geographic scope
-        for scope, keywords in self.geographic_scope.items():
-            for keyword in keywords:
-                if keyword.lower() in text:
-                    weight = self._get_scope_weight(scope)
-                    score += weight
-                    logger.debug(f"Scope '{keyword}' ({scope}) found, +{weight} score")
+        # Score based on keywords and geographic scope, in one scan
+        debug = logger.isEnabledFor(logging.DEBUG)
+        for term in hits:
+            weight = self.term_weights.get(term)
+            if weight is None:
+                continue
+            score += weight
+            if debug:
+                logger.debug(f"Term '{term}' found, +{weight} score")
         
         # Check for numbers indicating casualties or impact
         casualty_score = self._analyze_casualties(text)
         score += casualty_score
         
+        # Stories carried by several outlets (see clustering.py)
+        score += self._corroboration_bonus(event.get('source_count', 1))
+        
         return score
     
     def _get_keyword_weight(self, category: str) -> int:
@@ -80,6 +174,20 @@ class SeverityRanker:
         }
         return weights.get(scope, 1)
     
+    def _corroboration_bonus(self, source_count: int) -> int:
+        """
+        Extra score for a story reported by several outlets
+        
+        Args:
+            source_count: Number of distinct outlets carrying the story
+            
+        Returns:
+            Additional score (0 unless ``corroboration`` is configured)
+        """
+        per_source = self.corroboration.get('per_extra_source', 0)
+        bonus = max(0, source_count - 1) * per_source
+        return min(bonus, self.corroboration.get('max_bonus', bonus))
+    
     def _analyze_casualties(self, text: str) -> int:
         """
         Analyze text for casualty numbers
@@ -92,15 +200,13 @@ class SeverityRanker:
         """
         score = 0
         
+        # Every pattern needs a number; most texts have none
+        if not DIGIT_PATTERN.search(text):
+            return score
+        
         # Look for death/casualty patterns
-        patterns = [
-            r'(\d+)\s*(?:dead|killed|deaths|casualties|fatalities)',
-            r'(?:dead|killed|deaths):\s*(\d+)',
-            r'death toll:?\s*(\d+)'
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in CASUALTY_PATTERNS:
+            matches = pattern.findall(text)
             for match in matches:
                 try:
                     count = int(match)
@@ -117,24 +223,39 @@ class SeverityRanker:
         
         return score
     
+    def score_event(self, event: Dict) -> Dict:
+        """
+        Add severity and ticker fields to a single event in place
+
+        Args:
+            event: Event dictionary
+
+        Returns:
+            The same event, for use in generator pipelines
+        """
+        # Calculate severity sharing one text scan
+        scan = self._scan(event)
+        event['severity_score'] = self.calculate_severity(event, scan)
+        event['severity_level'] = self._get_severity_level(event['severity_score'])
+        # Add ticker flags if applicable
+        self._apply_ticker_flags(event, scan)
+        return event
+
     def rank_events(self, events: List[Dict]) -> List[Dict]:
         """
         Rank all events by severity
         
         Args:
-            events: List of event dictionaries
+            events: List of events (``models.Event`` objects or plain
+                dictionaries; both are scored in place)
             
         Returns:
             Sorted list of events with severity scores
         """
         logger.info(f"Ranking {len(events)} events")
         
-        # Calculate severity for each event
         for event in events:
-            event['severity_score'] = self.calculate_severity(event)
-            event['severity_level'] = self._get_severity_level(event['severity_score'])
-            # Add ticker flags if applicable
-            self._apply_ticker_flags(event)
+            self.score_event(event)
         
         # Sort by severity (highest first)
         ranked_events = sorted(events, key=lambda x: x['severity_score'], reverse=True)
@@ -143,59 +264,62 @@ class SeverityRanker:
         
         return ranked_events
 
-    def _apply_ticker_flags(self, event: Dict) -> None:
-        """Determine if event belongs in ticker and annotate flags"""
-        cfg = self.ticker.get('categories', {})
-        text = f"{event.get('title', '')} {event.get('description', '')}".lower()
+    def rank_batch(self, batch: Dict[str, Sequence[str]], top_k: Optional[int] = None) -> Dict:
+        """
+        Rank a columnar batch of events without building event dictionaries
+
+        Meant for backfills that only need the ranking, not annotated
+        events. Each text is scanned once, as in ``rank_events``, so scoring
+        takes about as long; with ``top_k`` only the k most severe events
+        are sorted and classified for the ticker. Results match
+        ``rank_events`` exactly, including the order of equal scores.
+
+        Args:
+            batch: Dictionary with parallel ``title`` and ``description``
+                sequences, and optionally ``source_count``
+            top_k: Only return the k most severe events (all if None)
+
+        Returns:
+            Dictionary of lists, most severe first: ``index`` (position in
+            the batch), ``severity_score``, ``severity_level``, ``is_ticker``,
+            ``ticker_category`` and ``ticker_emoji``
+        """
+        titles = batch.get('title', [])
+        descriptions = batch.get('description', [''] * len(titles))
+        source_counts = batch.get('source_count')
+        texts = [f"{title} {description}".lower() for title, description in zip(titles, descriptions)]
+        logger.info(f"Batch ranking {len(texts)} events")
+
+        scans = [(text, self.matcher.find(text)) for text in texts]
+        scores = []
+        for row, scan in enumerate(scans):
+            event = {'source_count': source_counts[row]} if source_counts is not None else {}
+            scores.append(self.calculate_severity(event, scan))
+
+        # Descending score, ties by position, like the stable sort in rank_events
+        key = lambda row: (-scores[row], row)
+        if top_k is None:
+            order = sorted(range(len(scores)), key=key)
+        else:
+            order = heapq.nsmallest(max(top_k, 0), range(len(scores)), key=key)
 
-        category = None
-        emoji = ''
-
-        # Airline disasters
-        air = cfg.get('airline_disaster', {})
-        if air:
-            if self._has_any(text, air.get('keywords_any', [])) and (
-                self._has_any(text, air.get('context_any', []))
-            ):
-                category, emoji = 'airline_disaster', air.get('emoji', '✈️')
-
-        # Natural disasters
-        if not category:
-            nd = cfg.get('natural_disaster', {})
-            if nd and self._has_any(text, nd.get('keywords_any', [])):
-                category, emoji = 'natural_disaster', nd.get('emoji', '🌪️')
-
-        # War
-        if not category:
-            war = cfg.get('war', {})
-            if war and self._has_any(text, war.get('keywords_any', [])):
-                category, emoji = 'war', war.get('emoji', '🪖')
-
-        # Terrorism
-        if not category:
-            ter = cfg.get('terrorism', {})
-            if ter and self._has_any(text, ter.get('keywords_any', [])):
-                category, emoji = 'terrorism', ter.get('emoji', '💥')
-
-        # Active shooter
-        if not category:
-            act = cfg.get('active_shooter', {})
-            if act and self._has_any(text, act.get('keywords_any', [])):
-                category, emoji = 'active_shooter', act.get('emoji', '🚨')
-
-        # Mass casualty
-        if not category:
-            mc = cfg.get('mass_casualty', {})
-            if mc:
-                if self._has_any(text, mc.get('keywords_any', [])) or self._has_casualty_threshold(text, mc.get('casualty_threshold', 10)):
-                    category, emoji = 'mass_casualty', mc.get('emoji', '🚑')
-
-        # Stock swings
-        if not category:
-            ss = cfg.get('stock_swing', {})
-            if ss:
-                if self._has_any(text, ss.get('finance_keywords', [])) and self._has_percent_threshold(text, ss.get('percent_threshold', 50)):
-                    category, emoji = 'stock_swing', ss.get('emoji', '📈')
+        result = {'index': order, 'severity_score': [], 'severity_level': [], 'is_ticker': [],
+                  'ticker_category': [], 'ticker_emoji': []}
+        for row in order:
+            category, emoji = self._classify_ticker(*scans[row])
+            result['severity_score'].append(scores[row])
+            result['severity_level'].append(self._get_severity_level(scores[row]))
+            result['is_ticker'].append(category is not None)
+            result['ticker_category'].append(category)
+            result['ticker_emoji'].append(emoji if category is not None else None)
+
+        logger.info(f"Batch ranking complete. Highest score: {scores[order[0]] if order else 0}")
+        return result
+
+    def _apply_ticker_flags(self, event: Dict, scan: tuple = None) -> None:
+        """Determine if event belongs in ticker and annotate flags"""
+        text, hits = scan or self._scan(event)
+        category, emoji = self._classify_ticker(text, hits)
 
         event['is_ticker'] = category is not None
         if category:
@@ -203,12 +327,30 @@ class SeverityRanker:
             event['ticker_emoji'] = emoji
             event['ticker_label'] = f"{emoji} {event.get('title', '')}"
 
-    def _has_any(self, text: str, words: List[str]) -> bool:
-        return any(w.lower() in text for w in words)
+    def _classify_ticker(self, text: str, hits: set) -> tuple:
+        """
+        Find the highest-priority ticker category an event falls into
+
+        Args:
+            text: Lowercased event text
+            hits: Terms matched in the text
+
+        Returns:
+            Tuple of (category, emoji), or (None, '') if no category applies
+        """
+        for rule in self.ticker_rules:
+            matched = all(hits & group for group in rule['groups'])
+            if rule['casualty_threshold'] is not None:
+                matched = matched or self._has_casualty_threshold(text, rule['casualty_threshold'])
+            if rule['percent_threshold'] is not None:
+                matched = matched and self._has_percent_threshold(text, rule['percent_threshold'])
+            if matched:
+                return rule['category'], rule['emoji']
+
+        return None, ''
 
     def _has_percent_threshold(self, text: str, threshold: int) -> bool:
-        import re
-        for m in re.finditer(r"(-?\d{1,3})\s*%", text):
+        for m in PERCENT_PATTERN.finditer(text):
             try:
                 val = abs(int(m.group(1)))
                 if val >= threshold:
@@ -218,8 +360,7 @@ class SeverityRanker:
         return False
 
     def _has_casualty_threshold(self, text: str, threshold: int) -> bool:
-        import re
-        for m in re.finditer(r"(?:dead|killed|deaths|casualties|fatalities)\s*:?\s*(\d+)", text):
+        for m in TICKER_CASUALTY_PATTERN.finditer(text):
             try:
                 val = int(m.group(1))
                 if val >= threshold:
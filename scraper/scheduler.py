@@ -0,0 +1,156 @@
+"""
+Polling scheduler module
+Keeps the next poll time of every source in a priority queue and adapts
+each source's interval to how often it changes and how severe its news is
+"""
+
+import heapq
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DAEMON_SETTINGS = {
+    'initial_interval': 600,   # seconds between polls of a source before anything is learned
+    'min_interval': 60,        # fastest a source is ever polled
+    'max_interval': 3600,      # slowest a source is ever polled
+    'speedup': 0.5,            # interval factor after a poll with new or changed events
+    'backoff': 1.5,            # interval factor after a poll with nothing new
+    'hot_score': 20,           # a new event scoring this high (Critical) drops the source to min_interval
+    'batch_window': 5,         # sources due within this many seconds join the same cycle
+    'polls_per_source_per_hour': 2,  # budget for all sources together (0 for none); 2 matches the half-hourly cron
+}
+
+
+class SourceScheduler:
+    """Priority queue of sources keyed by their next poll time"""
+
+    def __init__(self, sources: List[Dict], settings: Optional[Dict] = None, now: Optional[float] = None):
+        """
+        Schedule every source for an immediate first poll
+
+        Args:
+            sources: Source entries from sources.json
+            settings: Overrides for DEFAULT_DAEMON_SETTINGS
+            now: Current monotonic time (defaults to ``time.monotonic()``)
+        """
+        self.settings = {**DEFAULT_DAEMON_SETTINGS, **(settings or {})}
+        self.sources = list(sources)
+        self.intervals = [float(self.settings['initial_interval'])] * len(self.sources)
+        now = time.monotonic() if now is None else now
+        # The index breaks ties between sources due at the same time
+        self._queue: List[Tuple[float, int]] = [(now, index) for index in range(len(self.sources))]
+        heapq.heapify(self._queue)
+
+    def next_due(self) -> Optional[float]:
+        """Monotonic time the next source is due (None without sources)"""
+        return self._queue[0][0] if self._queue else None
+
+    def pop_due(self, now: float) -> List[int]:
+        """
+        Take every source due now (or within the batch window) off the queue
+
+        Each one must be handed back through ``observe``.
+
+        Args:
+            now: Current monotonic time
+
+        Returns:
+            Indexes into ``sources``
+        """
+        horizon = now + self.settings['batch_window']
+        due = []
+        while self._queue and self._queue[0][0] <= horizon:
+            due.append(heapq.heappop(self._queue)[1])
+        return due
+
+    def observe(self, index: int, changed: int, max_score: Optional[float], now: float) -> float:
+        """
+        Adapt a source's interval to its last poll and schedule the next one
+
+        Sources that keep changing are polled more often and quiet ones back
+        off. When the intervals add up to more polls per hour than the
+        budget allows, every source is stretched by the same factor, so hot
+        sources stay ahead of quiet ones without raising total volume.
+
+        Args:
+            index: Index of the polled source
+            changed: Number of new or changed events the poll returned
+            max_score: Highest severity score among them (None if none)
+            now: Monotonic time the poll finished
+
+        Returns:
+            Seconds until the source's next poll
+        """
+        settings = self.settings
+        interval = self.intervals[index] * (settings['speedup'] if changed else settings['backoff'])
+        interval = min(max(interval, settings['min_interval']), settings['max_interval'])
+        if max_score is not None and max_score >= settings['hot_score']:
+            interval = settings['min_interval']
+        self.intervals[index] = interval
+        interval = min(interval * self._budget_factor(), max(interval, settings['max_interval']))
+        heapq.heappush(self._queue, (now + interval, index))
+        return interval
+
+    def _budget_factor(self) -> float:
+        """Factor that brings the learned intervals within the hourly poll budget"""
+        budget = self.settings['polls_per_source_per_hour'] * len(self.sources)
+        if not budget:
+            return 1.0
+        # Sources stretched past max_interval stop at it, so the others absorb
+        # the rest; each pass caps at least one more source or settles
+        cap = self.settings['max_interval']
+        factor = 1.0
+        for _ in self.intervals:
+            capped = sum(3600 / max(interval, cap) for interval in self.intervals if interval * factor >= cap)
+            free = sum(3600 / interval for interval in self.intervals if interval * factor < cap)
+            if capped + free / factor <= budget * 1.000001:
+                break
+            if capped >= budget:
+                return cap / min(self.intervals)
+            factor = free / (budget - capped)
+        return factor
+
+
+def run_daemon(sources: List[Dict], cycle: Callable[[List[Dict]], Dict[str, Tuple[int, Optional[float]]]],
+               settings: Optional[Dict] = None, stop: Optional[threading.Event] = None) -> None:
+    """
+    Poll sources on their adaptive schedules until stopped
+
+    Args:
+        sources: Source entries from sources.json
+        cycle: Fetches, ranks and publishes the given sources; returns
+            source name -> (new or changed events, highest severity score)
+        settings: Overrides for DEFAULT_DAEMON_SETTINGS
+        stop: Event that ends the loop once set
+    """
+    stop = stop or threading.Event()
+    sources = [source for source in sources if source.get('enabled', True)]
+    scheduler = SourceScheduler(sources, settings)
+    if not sources:
+        logger.warning("No enabled sources, daemon has nothing to poll")
+        return
+
+    while not stop.is_set():
+        wait = scheduler.next_due() - time.monotonic()
+        if wait > 0 and stop.wait(wait):
+            break
+
+        due = scheduler.pop_due(time.monotonic())
+        due_sources = [sources[index] for index in due]
+        try:
+            results = cycle(due_sources)
+        except Exception as e:
+            logger.error(f"Cycle failed: {e}", exc_info=True)
+            results = {}
+
+        finished = time.monotonic()
+        for index in due:
+            name = sources[index].get('name', 'Unknown')
+            changed, max_score = results.get(name, (0, None))
+            interval = scheduler.observe(index, changed, max_score, finished)
+            logger.info(f"{name}: {changed} new or changed event(s), next poll in {interval:.0f}s")
+
+    logger.info("Daemon stopped")
@@ -0,0 +1,169 @@
+"""
+Event shard module
+Splits the ranked events into time-partitioned files (one per hour of
+publish time by default) plus a small index of shard ranges, so clients
+and backfill jobs can load only the window they need
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+from models import event_default
+from timestamps import iso_utc, published_timestamp
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+DEFAULT_SHARD_SETTINGS = {
+    'enabled': True,
+    'dir': '../docs/shards',   # relative to events.json; served with the dashboard
+    'hours': 1,                # publish-time hours per shard
+    'keep_hours': 0,           # keep shards that left events.json for this long (0 mirrors events.json)
+}
+
+INDEX_NAME = 'index.json'
+UNDATED = 'undated'
+
+
+def _event_time(event: Dict) -> Optional[float]:
+    """Publish timestamp of an event (None if it has no readable date)"""
+    timestamp = event.get('published_ts')
+    if timestamp is None:
+        timestamp = published_timestamp(event.get('published'))
+    return timestamp
+
+
+def _shard_name(start: Optional[int]) -> str:
+    """File name of the shard starting at ``start`` (None for undated events)"""
+    if start is None:
+        return f"events-{UNDATED}.json"
+    return f"events-{datetime.fromtimestamp(start, timezone.utc).strftime('%Y%m%dT%H')}.json"
+
+
+def _write_atomic(path: Path, body: bytes) -> None:
+    """Write a file under a temporary name and move it into place"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_bytes(body)
+    os.replace(tmp_path, path)
+
+
+def _load_index(path: Path) -> Dict:
+    """Previous shard index, or an empty one"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def partition(events: List[Dict], hours: int = 1) -> Dict[Optional[int], List[Dict]]:
+    """
+    Group events by publish-time window
+
+    Args:
+        events: Ranked events, in output order
+        hours: Hours per window
+
+    Returns:
+        Dictionary of window start (POSIX seconds, None for undated events)
+        -> events in their original order
+    """
+    span = hours * 3600
+    groups: Dict[Optional[int], List[Dict]] = {}
+    for event in events:
+        timestamp = _event_time(event)
+        start = None if timestamp is None else int(timestamp // span * span)
+        groups.setdefault(start, []).append(event)
+    return groups
+
+
+def write_shards(events: List[Dict], output_dir: Path, settings: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    Write the events as time-partitioned shards and their index
+
+    Shards whose events did not change keep their file untouched, so a
+    run only rewrites the hours that got new or updated events. The index
+    is written last, so readers never see it point at a missing shard.
+
+    Args:
+        events: Ranked events, in output order
+        output_dir: Directory of events.json
+        settings: Overrides for DEFAULT_SHARD_SETTINGS; ``dir`` places
+            the shards relative to ``output_dir``
+
+    Returns:
+        Index dictionary, or None when sharding is disabled
+    """
+    settings = {**DEFAULT_SHARD_SETTINGS, **(settings or {})}
+    if not settings['enabled']:
+        return None
+
+    shard_dir = Path(os.path.normpath(Path(output_dir) / settings['dir']))
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    span = settings['hours'] * 3600
+    previous = {entry['file']: entry for entry in _load_index(shard_dir / INDEX_NAME).get('shards', [])}
+
+    entries = []
+    written = 0
+    groups = partition(events, settings['hours'])
+    for start, shard_events in groups.items():
+        name = _shard_name(start)
+        shard = {
+            'v': FORMAT_VERSION,
+            'start': None if start is None else iso_utc(start),
+            'end': None if start is None else iso_utc(start + span),
+            'event_count': len(shard_events),
+            'events': shard_events,
+        }
+        body = json.dumps(shard, ensure_ascii=False, separators=(',', ':'), default=event_default).encode('utf-8')
+        digest = hashlib.sha256(body).hexdigest()[:16]
+        old = previous.get(name)
+        if not old or old.get('hash') != digest or not (shard_dir / name).exists():
+            _write_atomic(shard_dir / name, body)
+            written += 1
+        entries.append({
+            'file': name,
+            'start': shard['start'],
+            'end': shard['end'],
+            'start_ts': start,
+            'end_ts': None if start is None else start + span,
+            'event_count': len(shard_events),
+            'bytes': len(body),
+            'hash': digest,
+        })
+
+    # Shards whose events all left events.json: older ones are kept for
+    # keep_hours, anything else is removed with its file
+    current = {entry['file'] for entry in entries}
+    oldest = min((start for start in groups if start is not None), default=None)
+    horizon = time.time() - settings['keep_hours'] * 3600
+    for name, entry in previous.items():
+        if name in current:
+            continue
+        start = entry.get('start_ts')
+        kept = (settings['keep_hours'] and start is not None and entry.get('end_ts', 0) > horizon
+                and (oldest is None or start < oldest) and (shard_dir / name).exists())
+        if kept:
+            entries.append(entry)
+        else:
+            (shard_dir / name).unlink(missing_ok=True)
+
+    # Newest first, undated last
+    entries.sort(key=lambda entry: (entry['start_ts'] is None, -(entry['start_ts'] or 0)))
+    index = {
+        'v': FORMAT_VERSION,
+        'last_updated': datetime.utcnow().isoformat() + "Z",
+        'hours': settings['hours'],
+        'event_count': sum(entry['event_count'] for entry in entries),
+        'shards': entries,
+    }
+    _write_atomic(shard_dir / INDEX_NAME, json.dumps(index, separators=(',', ':')).encode('utf-8'))
+
+    logger.info(f"Wrote {written} of {len(groups)} event shards to {shard_dir}")
+    return index
@@ -0,0 +1,117 @@
+"""
+Timestamp module
+Parses the publish dates delivered by feeds and APIs (RFC 822, ISO 8601
+and the odd free-form date) into UTC timestamps and ISO strings
+"""
+
+import logging
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from dateutil import parser as date_parser
+from dateutil import tz
+
+logger = logging.getLogger(__name__)
+
+# Zone abbreviations seen in feeds that neither RFC 822 nor dateutil resolve
+TZINFOS = {
+    'UTC': tz.UTC, 'GMT': tz.UTC, 'Z': tz.UTC,
+    'EST': tz.tzoffset('EST', -5 * 3600), 'EDT': tz.tzoffset('EDT', -4 * 3600),
+    'CST': tz.tzoffset('CST', -6 * 3600), 'CDT': tz.tzoffset('CDT', -5 * 3600),
+    'MST': tz.tzoffset('MST', -7 * 3600), 'MDT': tz.tzoffset('MDT', -6 * 3600),
+    'PST': tz.tzoffset('PST', -8 * 3600), 'PDT': tz.tzoffset('PDT', -7 * 3600),
+    'CET': tz.tzoffset('CET', 3600), 'CEST': tz.tzoffset('CEST', 2 * 3600),
+    'EET': tz.tzoffset('EET', 2 * 3600), 'EEST': tz.tzoffset('EEST', 3 * 3600),
+    'MSK': tz.tzoffset('MSK', 3 * 3600), 'JST': tz.tzoffset('JST', 9 * 3600),
+    'AEST': tz.tzoffset('AEST', 10 * 3600), 'AEDT': tz.tzoffset('AEDT', 11 * 3600),
+}
+
+
+
+def _zone(name: Optional[str], offset: Optional[int]):
+    """
+    ``tzinfos`` hook for dateutil
+
+    Resolves TZINFOS abbreviations and numeric offsets. Zones it does not
+    know come back as None (read as UTC), which also keeps dateutil from
+    warning about them without touching the process-wide warning filters.
+    """
+    if name in TZINFOS:
+        return TZINFOS[name]
+    if offset:
+        return tz.tzoffset(name, offset)
+    return tz.UTC if offset == 0 else None
+
+
+# "[Tue, ]18 Oct 2026 10:00[:00] +0000|GMT|EST": the shape the stdlib RFC 822 parser reads correctly
+RFC_822 = re.compile(r'^(?:[A-Za-z]{3},\s*)?\d{1,2}\s+[A-Za-z]{3}\s+\d{2,4}\s+\d{1,2}:\d{2}(?::\d{2})?\s+'
+                     r'(?:[+-]\d{4}|[A-Za-z]{1,3})$')
+
+
+@lru_cache(maxsize=8192)
+def published_timestamp(value: Optional[str]) -> Optional[float]:
+    """
+    Parse an RSS (RFC 822), API (ISO 8601) or free-form publish date
+
+    ISO and RFC 822 dates take the fast stdlib parsers; anything else
+    falls back to dateutil. Dates without a zone are taken as UTC.
+
+    Args:
+        value: Date string as delivered by the source
+
+    Returns:
+        POSIX timestamp, or None if the date is missing or unreadable
+    """
+    if not value or not value.strip():
+        return None
+
+    value = value.strip()
+    parsed = None
+    if value[0].isdigit():
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    if parsed is None and RFC_822.match(value):
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            pass
+        if parsed is not None and parsed.tzinfo is None and not value.endswith('-0000'):
+            parsed = None  # zone the stdlib does not know, e.g. CEST
+    if parsed is None:
+        try:
+            parsed = date_parser.parse(value, tzinfos=_zone)
+        except (ValueError, OverflowError):
+            logger.debug(f"Unreadable publish date: {value!r}")
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def iso_utc(timestamp: float) -> str:
+    """Format a POSIX timestamp as an ISO 8601 UTC string (``2024-01-31T12:00:00Z``)"""
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def normalize_published(value: Optional[str], fallback: Optional[float] = None) -> Tuple[str, int]:
+    """
+    Normalize a publish date to an ISO 8601 UTC string and an epoch
+
+    Args:
+        value: Date string as delivered by the source
+        fallback: Timestamp to use when the date is missing or unreadable
+            (defaults to now)
+
+    Returns:
+        Tuple of (ISO string, POSIX timestamp in whole seconds)
+    """
+    timestamp = published_timestamp(value)
+    if timestamp is None:
+        timestamp = datetime.now(timezone.utc).timestamp() if fallback is None else fallback
+    timestamp = int(timestamp)
+    return iso_utc(timestamp), timestamp
@@ -0,0 +1,50 @@
+"""
+Tests for story clustering
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scraper'))
+
+from clustering import StoryClusterer  # noqa: E402
+
+
+class StoryClustererTest(unittest.TestCase):
+    def setUp(self):
+        self.clusterer = StoryClusterer()
+
+    def test_near_identical_titles_are_grouped(self):
+        events = [
+            {'id': 'a', 'source': 'A', 'title': 'Magnitude 6 earthquake strikes northern Chile coast near Antofagasta'},
+            {'id': 'b', 'source': 'B', 'title': 'Magnitude 6 earthquake strikes northern Chile coast near Antofagasta port'},
+        ]
+        self.assertEqual(self.clusterer.cluster(events), [[0, 1]])
+
+    def test_chained_titles_do_not_merge_their_ends(self):
+        titles = [
+            'Magnitude 6 earthquake strikes northern Chile coast near Antofagasta port',
+            'Magnitude 6 earthquake strikes northern Chile coast near Antofagasta, tsunami warning issued',
+            'Earthquake strikes northern Chile coast near Antofagasta, tsunami warning issued for Peru',
+        ]
+        events = [{'id': str(i), 'title': title} for i, title in enumerate(titles)]
+        a, b, c = (self.clusterer.shingles(event) for event in events)
+        threshold = self.clusterer.settings['threshold']
+        self.assertGreaterEqual(self.clusterer.similarity(a, b), threshold)
+        self.assertGreaterEqual(self.clusterer.similarity(b, c), threshold)
+        self.assertLess(self.clusterer.similarity(a, c), threshold)
+
+        clusters = self.clusterer.cluster(events)
+        self.assertEqual(len(clusters), 2)
+        cluster_of = {index: n for n, members in enumerate(clusters) for index in members}
+        self.assertNotEqual(cluster_of[0], cluster_of[2])
+
+    def test_distinct_stories_with_shared_wording_stay_separate(self):
+        events = [{'id': f'{i}-{j}', 'title': f'API war story {i}-{j} about conflict'}
+                  for i in range(4) for j in range(5)]
+        self.assertEqual(len(self.clusterer.collapse(events)), 20)
+
+
+if __name__ == '__main__':
+    unittest.main()